@@ -1,3 +1,44 @@
 from .interface import *
-from .implementations import *
 from .checker import *
+from .statistics import *
+
+from . import interface as _interface
+from . import checker as _checker
+from . import statistics as _statistics
+
+import importlib as _importlib
+
+# these are imported the first time they are used, to keep importing
+# quickcheck itself cheap
+_lazy = {
+    'implementations': ['shrink_sequence', 'sequence_passes', 'Constant', 'Choice', 'Any',
+                        'Frequency', 'Maybe', 'Deferred', 'Recursive', 'Float', 'Integer',
+                        'Char', 'List', 'Tuple', 'Dict', 'Bytes', 'Corpus'],
+    'typehints': ['resolve', 'Record'],
+    'isolation': ['Isolation', 'TrialTimeout', 'TrialCrashed'],
+    'cache': ['Cache'],
+    'memory': ['MemoryLimitExceeded', 'MemoryReport'],
+    'growth': ['ComplexityError', 'ComplexityReport', 'complexity'],
+    'differential': ['NotEquivalent', 'EquivalenceReport', 'equivalent'],
+    'arrays': ['Array'],
+    'profiler': ['GenerationProfile', 'profiling'],
+}
+_lazy_names = {name: module for module, names in _lazy.items() for name in names}
+
+# these need packages quickcheck doesn't, so import * leaves them out
+_optional = {'arrays'}
+
+__all__ = _interface.__all__ + _checker.__all__ + _statistics.__all__ + \
+    [name for name, module in _lazy_names.items() if module not in _optional]
+
+def __getattr__(name):
+    try:
+        module = _lazy_names[name]
+    except KeyError:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name)) from None
+    val = getattr(_importlib.import_module('.' + module, __name__), name)
+    globals()[name] = val
+    return val
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names))
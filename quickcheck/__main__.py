@@ -1,7 +1,6 @@
-from . import *
+from .runner import main
+
+import sys
 
 if __name__ == '__main__':
-    import code
-    import pkg_resources
-    version = pkg_resources.require("pyquickcheck")[0].version
-    code.interact(banner="pyquickcheck {}".format(version), local=locals())
+    sys.exit(main())
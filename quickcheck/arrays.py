@@ -0,0 +1,155 @@
+"""Specs for NumPy arrays, filled in bulk by NumPy's own generator. This
+module needs NumPy, which the rest of quickcheck does not.
+"""
+
+from .interface import ArbitrarySpec, rng, shrink
+from .implementations import _number_series
+from .roundrobin import roundrobin
+
+import itertools
+
+try:
+    import numpy
+except ImportError as e:
+    raise ImportError("quickcheck.arrays needs numpy") from e
+
+__all__ = ['Array']
+
+class Array(ArbitrarySpec):
+    """NumPy arrays of dtype. shape is a tuple of lengths, where None
+    marks an axis whose length is arbitrary, or a number of dimensions
+    that are all arbitrary. The size budget is the most elements an
+    array can have, though axes of fixed length are never cut short.
+
+    elements gives (low, high) bounds for the values. By default,
+    integers cover their whole dtype, and floats lie between -1 and 1.
+
+    Arrays shrink to views of themselves, cut in half or by one along
+    each arbitrary axis, and then to copies with parts set to the
+    simplest value allowed, and with single elements shrunk.
+    """
+    def __init__(self, dtype=float, shape=(None,), elements=None):
+        self.dtype = numpy.dtype(dtype)
+        if isinstance(shape, int):
+            shape = (None,) * shape
+        self.shape = tuple(shape)
+        kind = self.dtype.kind
+        if kind not in 'biufc':
+            raise ValueError("unsupported dtype: {}".format(self.dtype))
+        if elements is None:
+            if kind == 'b':
+                elements = (False, True)
+            elif kind in 'iu':
+                info = numpy.iinfo(self.dtype)
+                elements = (int(info.min), int(info.max))
+            else:
+                elements = (-1.0, 1.0)
+        low, high = elements
+        if low > high:
+            raise ValueError("element minimum is greater than element maximum")
+        self.elements = (low, high)
+
+    @property
+    def simplest(self):
+        low, high = self.elements
+        return min(max(0, low), high)
+
+    def lengths(self, size):
+        free = [i for i, n in enumerate(self.shape) if n is None]
+        fixed = 1
+        for n in self.shape:
+            if n is not None:
+                fixed *= n
+        budget = size // max(fixed, 1) if size is not None else 30
+        shape = list(self.shape)
+        for k, i in enumerate(free):
+            # give each remaining axis about an equal share of the budget
+            limit = int(max(budget, 0) ** (1 / (len(free) - k)))
+            shape[i] = rng().randint(0, limit)
+            budget //= max(shape[i], 1)
+        return tuple(shape)
+
+    def fill(self, generator, shape):
+        low, high = self.elements
+        kind = self.dtype.kind
+        if kind == 'b':
+            if low == high:
+                return numpy.full(shape, bool(low))
+            return generator.integers(0, 2, size=shape).astype(bool)
+        if kind in 'iu':
+            return generator.integers(low, high, size=shape, dtype=self.dtype, endpoint=True)
+        values = generator.uniform(low, high, size=shape)
+        if kind == 'c':
+            values = values + 1j * generator.uniform(low, high, size=shape)
+        return values.astype(self.dtype)
+
+    def arbitrary(self, size=None):
+        shape = self.lengths(size)
+        # one draw seeds numpy, so seeded() and replays still work
+        generator = numpy.random.default_rng(rng().getrandbits(64))
+        return self.fill(generator, shape)
+
+    def series(self, depth):
+        low, high = self.elements
+        if self.dtype.kind == 'b':
+            values = [False, True][:depth + 1]
+        else:
+            values = list(_number_series(low, high, depth))
+        free = [i for i, n in enumerate(self.shape) if n is None]
+        for lengths in itertools.product(range(depth + 1), repeat=len(free)):
+            shape = list(self.shape)
+            for i, n in zip(free, lengths):
+                shape[i] = n
+            if 0 in lengths:
+                # every value makes the same empty array
+                yield numpy.zeros(shape, dtype=self.dtype)
+                continue
+            for value in values:
+                yield numpy.full(shape, value, dtype=self.dtype)
+
+    def _axis(self, v, axis, s):
+        index = [slice(None)] * v.ndim
+        index[axis] = s
+        return v[tuple(index)]
+
+    def sliced(self, v):
+        def along(axis):
+            n = v.shape[axis]
+            if n > 2:
+                yield self._axis(v, axis, slice(0, n // 2))
+                yield self._axis(v, axis, slice(n // 2, n))
+            if n > 0:
+                yield self._axis(v, axis, slice(0, n - 1))
+                yield self._axis(v, axis, slice(1, n))
+        return roundrobin(*(along(axis) for axis, n in enumerate(self.shape) if n is None))
+
+    def zeroed(self, v):
+        simplest = self.simplest
+        if v.size == 0 or not (v != simplest).any():
+            return
+        yield numpy.full_like(v, simplest)
+        # then each half along each axis that still isn't simple
+        for axis in range(v.ndim):
+            n = v.shape[axis]
+            for s in (slice(0, n // 2), slice(n // 2, n)):
+                if n > 1 and (self._axis(v, axis, s) != simplest).any():
+                    c = v.copy()
+                    self._axis(c, axis, s)[...] = simplest
+                    yield c
+
+    def simplified(self, v):
+        low, high = self.elements
+        def element(i):
+            for s in shrink(v.flat[i].item()):
+                if low <= s <= high:
+                    c = v.copy()
+                    c.flat[i] = s
+                    yield c
+        return roundrobin(*(element(i) for i in range(v.size)))
+
+    def shrink_passes(self, v):
+        return [('slice', self.sliced(v)), ('zero', self.zeroed(v)),
+                ('simplify', self.simplified(v))]
+
+    def shrink(self, v):
+        return itertools.chain(self.sliced(v), self.zeroed(v), self.simplified(v))
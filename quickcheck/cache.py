@@ -0,0 +1,134 @@
+"""Remember which properties passed, so that unchanged properties can
+be skipped, or checked less, on later runs.
+"""
+
+from .interface import ArbitrarySpec
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+import types
+
+__all__ = ['Cache']
+
+def _hash_code(h, code):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _hash_code(h, const)
+        else:
+            h.update(repr(const).encode('utf-8'))
+
+def _describe(v, seen):
+    """Like repr(), but the same from one run to the next, which
+    doesn't hold for the default repr of specs and functions.
+    """
+    if isinstance(v, ArbitrarySpec):
+        if id(v) in seen:
+            # a spec that refers to itself, like Recursive
+            return '...'
+        seen = seen | {id(v)}
+        fields = []
+        for name, val in sorted(vars(v).items()):
+            if name.startswith('_') or isinstance(val, type(threading.local())):
+                continue
+            fields.append("{}={}".format(name, _describe(val, seen)))
+        return "{}({})".format(type(v).__qualname__, ", ".join(fields))
+    if isinstance(v, (list, tuple)):
+        return "{}({})".format(type(v).__name__, ", ".join(_describe(x, seen) for x in v))
+    if isinstance(v, dict):
+        return "{{{}}}".format(", ".join("{}: {}".format(_describe(k, seen), _describe(x, seen))
+                                         for k, x in v.items()))
+    if isinstance(v, types.FunctionType):
+        h = hashlib.blake2b(digest_size=8)
+        _hash_code(h, v.__code__)
+        return "<function {} {}>".format(v.__qualname__, h.hexdigest())
+    if isinstance(v, type):
+        return "{}.{}".format(v.__module__, v.__qualname__)
+    if type(v).__module__ == 'numpy' and type(v).__name__ == 'ndarray':
+        # their repr leaves out the middle of big arrays
+        if v.dtype.hasobject:
+            return "ndarray({}, {})".format(v.shape, _describe(v.tolist(), seen))
+        h = hashlib.blake2b(v.tobytes(), digest_size=16)
+        return "ndarray({}, {}, {})".format(v.dtype.str, v.shape, h.hexdigest())
+    if type(v).__repr__ is object.__repr__ and hasattr(v, '__dict__'):
+        # the default repr has an address in it, like Isolation's
+        return "{}({})".format(type(v).__qualname__, ", ".join(
+            "{}={}".format(name, _describe(val, seen)) for name, val in sorted(vars(v).items())
+            if not name.startswith('_')))
+    return repr(v)
+
+def _module_source(module):
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return repr(module).encode('utf-8')
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _full_run_from_environment():
+    return os.environ.get('QUICKCHECK_FULL_RUN', '') not in ('', '0')
+
+class Cache:
+    """A record of properties that passed, kept as JSON in path, for
+    use as the cache argument to quickcheck(). A property is looked up
+    by a hash of its code, its specs and settings, and the source of
+    the modules it was given.
+
+    If full_run is true, everything is checked in full, but passes are
+    still recorded. By default, it is true when the QUICKCHECK_FULL_RUN
+    environment variable is set to anything but 0.
+    """
+    def __init__(self, path='.quickcheck_cache', full_run=None):
+        if full_run is None:
+            full_run = _full_run_from_environment()
+        self.path = path
+        self.full_run = full_run
+        self.lock = threading.Lock()
+
+    def key(self, f, specs, modules=(), settings=None):
+        """The key for property f, with specs for its arguments."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update("{}.{}\n".format(f.__module__, f.__qualname__).encode('utf-8'))
+        _hash_code(h, f.__code__)
+        h.update(repr(f.__defaults__).encode('utf-8'))
+        for name, spec in sorted(specs.items()):
+            h.update("{}: {}\n".format(name, _describe(spec, frozenset())).encode('utf-8'))
+        h.update(_describe(settings, frozenset()).encode('utf-8'))
+        for module in modules:
+            h.update(_module_source(module))
+        return h.hexdigest()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, entries):
+        tmp = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def passed(self, key):
+        """Whether the property with this key passed before."""
+        return key in self.load()
+
+    def record(self, key, name):
+        with self.lock:
+            entries = self.load()
+            entries[key] = {'name': name, 'time': time.time()}
+            self.save(entries)
+
+    def forget(self, key):
+        with self.lock:
+            entries = self.load()
+            if entries.pop(key, None) is not None:
+                self.save(entries)
@@ -1,86 +1,715 @@
 """Decorator for properties that will check them when called."""
 
 from .decorator import decorator
-from .roundrobin import roundrobin
-from .interface import arbitrary, shrink, sized
+from .interface import arbitrary, series, sized, seeded, shrink_passes
+from . import statistics
+from . import choices
 
-__all__ = ['QuickCheckError', 'quickcheck']
+import collections
+import contextlib
+import functools
+import itertools
+import random
+import time
+import os
+
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+
+__all__ = ['QuickCheckError', 'MultipleFailures', 'CoverageError', 'Report', 'ShrinkState', 'quickcheck']
 
 class QuickCheckError(Exception):
-    pass
+    """Raised with the minimized arguments when a property fails. If
+    minimization happened, shrink holds its final ShrinkState, and
+    report holds the Report for the trials run so far. With the
+    choices engine, replay holds a string that reproduces it.
+    """
+    def __init__(self, used, shrink=None, report=None):
+        super().__init__(used)
+        self.used = used
+        self.shrink = shrink
+        self.report = report
+        self.fingerprint = None
+        self.occurrences = 1
+        self.replay = None
+    
+    def __str__(self):
+        s = repr(self.used)
+        if self.shrink is not None:
+            s += " ({})".format(self.shrink)
+        if self.replay is not None:
+            s += " [replay={!r}]".format(self.replay)
+        return s
+
+class MultipleFailures(QuickCheckError):
+    """Raised when quickcheck(max_failures=...) finds more than one
+    distinct failure. failures holds a QuickCheckError for each.
+    """
+    def __init__(self, failures, report=None):
+        super().__init__(failures[0].used, failures[0].shrink, report)
+        self.failures = failures
+        self.__cause__ = failures[0].__cause__
+    
+    def __str__(self):
+        lines = ["{} distinct failures".format(len(self.failures))]
+        for err in self.failures:
+            exctype, location = err.fingerprint
+            where = "{}:{} in {}".format(*location) if location else "unknown location"
+            lines.append("{} at {} ({} times): {}".format(
+                exctype.__name__, where, err.occurrences, err))
+        return "\n".join(lines)
+
+class CoverageError(Exception):
+    """Raised when a property's cover() requirements are not met."""
+    def __init__(self, report):
+        super().__init__(str(report))
+        self.report = report
+
+class Report:
+    """A summary of a quickcheck run: the number of successful and
+    discarded trials, the number of generated arguments skipped as
+    duplicates, and the Statistics of their labels. exhausted is True
+    if checking stopped early because nothing new was generated, and
+    cached is True if it was skipped because it passed before. If
+    memory was tracked, memory holds a MemoryReport. out_of_time is
+    True if checking stopped early at the time budget. targets maps
+    the names given to target() to the highest scores, as (score,
+    arguments), highest first. searched counts the trials run by
+    maximize, which aren't counted in successes, discards or
+    statistics.
+    """
+    keep_targets = 5
+    
+    def __init__(self):
+        self.successes = 0
+        self.discards = 0
+        self.duplicates = 0
+        self.searched = 0
+        self.exhausted = False
+        self.out_of_time = False
+        self.cached = False
+        self.memory = None
+        self.targets = {}
+        self.statistics = statistics.Statistics()
+    
+    def add_targets(self, trial, used):
+        for name, score in trial.targets.items():
+            highest = self.targets.setdefault(name, [])
+            highest.append((score, used))
+            highest.sort(key=lambda t: t[0], reverse=True)
+            del highest[self.keep_targets:]
+    
+    def __str__(self):
+        s = "passed {} tests".format(self.successes)
+        notes = []
+        if self.discards:
+            notes.append("{} discarded".format(self.discards))
+        if self.duplicates:
+            notes.append("{} duplicates skipped".format(self.duplicates))
+        if self.searched:
+            notes.append("{} searched".format(self.searched))
+        if self.exhausted:
+            notes.append("no new inputs found")
+        if self.out_of_time:
+            notes.append("time budget used up")
+        if self.cached:
+            notes.append("cached")
+        if notes:
+            s += " ({})".format(", ".join(notes))
+        labels = str(self.statistics)
+        if labels:
+            s += "\n" + labels
+        for name, highest in self.targets.items():
+            score, used = highest[0]
+            text = repr(used)
+            if len(text) > 200:
+                text = text[:197] + '...'
+            s += "\nhighest {}: {!r} for {}".format(name or 'target', score, text)
+        if self.memory is not None:
+            s += "\n" + str(self.memory)
+        return s
+
+class ShrinkState:
+    """Tracks the progress of a minimization against its budgets:
+    shrink_budget accepted steps, shrink_timeout seconds, and
+    max_shrink_calls calls to the property. Any of these may be
+    None. If given, progress is called with this object at most every
+    interval seconds while shrinking, and once more at the end, when
+    reason says why shrinking stopped.
+    """
+    def __init__(self, used, shrink_budget=None, shrink_timeout=None, max_shrink_calls=None, progress=None, interval=1.0):
+        self.used = used
+        self.steps = 0
+        self.calls = 0
+        self.reason = None
+        self.shrink_budget = shrink_budget
+        self.shrink_timeout = shrink_timeout
+        self.max_shrink_calls = max_shrink_calls
+        self.progress = progress
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+    
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+    
+    def __str__(self):
+        s = "shrunk in {} steps, {} calls".format(self.steps, self.calls)
+        if self.reason:
+            s += "; stopped: {}".format(self.reason)
+        return s
+    
+    def exhausted(self):
+        """Returns True, and sets reason, if any budget has run out."""
+        if self.shrink_budget is not None and self.steps >= self.shrink_budget:
+            self.reason = 'shrink_budget'
+        elif self.max_shrink_calls is not None and self.calls >= self.max_shrink_calls:
+            self.reason = 'max_shrink_calls'
+        elif self.shrink_timeout is not None and self.elapsed >= self.shrink_timeout:
+            self.reason = 'shrink_timeout'
+        return self.reason is not None
+    
+    def batch(self, n):
+        """How many of the next n calls fit in max_shrink_calls."""
+        if self.max_shrink_calls is not None:
+            n = min(n, self.max_shrink_calls - self.calls)
+        return max(n, 0)
+    
+    def called(self, accepted):
+        self.calls += 1
+        if accepted:
+            self.steps += 1
+        if self.progress and time.monotonic() - self.last_report >= self.interval:
+            self.last_report = time.monotonic()
+            self.progress(self)
+    
+    def stop(self, reason=None):
+        if reason:
+            self.reason = reason
+        if self.progress:
+            self.progress(self)
 
-def _quickcheck_minimize(f, args, kwargs, used, exctype):
+def _quickcheck_minimize(f, args, kwargs, used, exctype, state=None, specs={}, fingerprint=None,
+                         executor=None, batch_size=1):
     """Given a function f, arguments to that function, and a set of
     quickcheck-produced values, attempt to minimize those values while
-    preserving the exception type generated.
+    preserving the exception type generated. If given, state is a
+    ShrinkState that limits how long this goes on for, specs maps
+    argument names to the specs that produced them, and fingerprint
+    must also match for a smaller failure to count.
+    
+    Arguments and their shrink passes are tried in order of how often
+    they have worked so far. Arguments that can't be shrunk further
+    are left alone until everything else is minimal, and then only
+    checked again if another argument has changed since.
+    
+    If executor is given, candidates are run on it batch_size at a
+    time, and the first failing candidate in each batch is taken.
     """
+    if state is None:
+        state = ShrinkState(used)
     
-    def arg_shrinks(arg):
-        v = used[arg]
-        for x in shrink(v):
-            yield (arg, x)
+    def fails(kwargs_new):
+        try:
+            f(*args, **kwargs_new)
+        except Exception as e:
+            return isinstance(e, exctype) and \
+                (fingerprint is None or _fingerprint(e) == fingerprint)
+        return False
     
-    while True:
-        for name, v in roundrobin(*(arg_shrinks(name) for name in used)):
-            kwargs_new = kwargs.copy()
-            kwargs_new.update(used)
-            kwargs_new[name] = v
-            try:
-                f(*args, **kwargs_new)
-            except exctype:
-                # successful minimization!
-                used[name] = v
+    # (successes, attempts) for each (argument, pass)
+    tried = {}
+    def score(key):
+        successes, attempts = tried.get(key, (0, 0))
+        return (successes + 1) / (attempts + 2)
+    def arg_score(name):
+        return max([score(key) for key in tried if key[0] == name] or [0.5])
+    
+    # the number of steps taken when each argument stopped shrinking
+    fixed = {}
+    while not state.exhausted():
+        names = [name for name in used if name not in fixed]
+        if not names:
+            names = [name for name, steps in fixed.items() if steps < state.steps]
+            if not names:
+                # we can't minimize anything, so
+                state.reason = 'minimal'
+                break
+            for name in names:
+                del fixed[name]
+        names.sort(key=arg_score, reverse=True)
+        
+        changed = False
+        for name in names:
+            passes = shrink_passes(specs.get(name), used[name])
+            passes.sort(key=lambda p: score((name, p[0])), reverse=True)
+            for pname, shrinks in passes:
+                key = (name, pname)
+                shrinks = iter(shrinks)
+                while not changed and not state.exhausted():
+                    batch = list(itertools.islice(shrinks, state.batch(batch_size)))
+                    if not batch:
+                        break
+                    candidates = []
+                    for v in batch:
+                        kwargs_new = kwargs.copy()
+                        kwargs_new.update(used)
+                        kwargs_new[name] = v
+                        candidates.append(kwargs_new)
+                    if executor is None:
+                        outcomes = map(fails, candidates)
+                    else:
+                        outcomes = executor.map(fails, candidates)
+                    for v, failed in zip(batch, outcomes):
+                        successes, attempts = tried.get(key, (0, 0))
+                        if failed and not changed:
+                            # successful minimization!
+                            used[name] = v
+                            tried[key] = (successes + 1, attempts + 1)
+                            state.called(True)
+                            changed = True
+                        else:
+                            tried[key] = (successes, attempts + 1)
+                            state.called(False)
+                if changed or state.exhausted():
+                    break
+            if changed or state.exhausted():
                 break
-        else:
-            # we never minimized anything, so
-            break
+            fixed[name] = state.steps
     
+    state.stop()
     return used
 
+def failure_location(tb):
+    """The innermost frame of a traceback that isn't in quickcheck
+    itself, as (filename, line number, function name).
+    """
+    location = None
+    while tb is not None:
+        code = tb.tb_frame.f_code
+        if os.path.dirname(os.path.abspath(code.co_filename)) != _package_dir:
+            location = (code.co_filename, tb.tb_lineno, code.co_name)
+        tb = tb.tb_next
+    return location
+
+def _fingerprint(e):
+    # exceptions from isolated workers carry their location with them
+    location = getattr(e, '_quickcheck_location', None)
+    if location is None:
+        location = failure_location(e.__traceback__)
+    return (type(e), location)
+
+def _quickcheck_error(call, kwargs, used, e, state, results):
+    """Run the property once more with the minimized values, and make
+    a QuickCheckError caused by the exception it raises.
+    """
+    kwargs_new = kwargs.copy()
+    kwargs_new.update(used)
+    try:
+        call(**kwargs_new)
+    except Exception as reemitted:
+        e = reemitted
+    err = QuickCheckError(used, state, results)
+    err.__cause__ = e
+    return err
+
+def _threaded(executor, fn, arguments, window):
+    """Like map(fn, arguments) on executor, but only keeps window
+    calls in flight, and cancels the rest when closed.
+    """
+    pending = collections.deque()
+    try:
+        for a in arguments:
+            pending.append(executor.submit(fn, *a))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
 @decorator
-def quickcheck(f, tries=100, max_size=100, max_discard_ratio=10):
+def quickcheck(f, tries=100, max_size=100, max_discard_ratio=10, isolate=None,
+               shrink_budget=None, shrink_timeout=None, max_shrink_calls=None,
+               shrink_progress=None, shrink_progress_interval=1.0,
+               report=None, max_cover_ratio=10, max_failures=1, threads=None,
+               engine='values', replay=None, mode='random', depth=3,
+               dedup=False, max_duplicates=100,
+               seed=None, cache=None, modules=(), cached_tries=0,
+               track_memory=False, max_trial_memory=None, max_memory_growth=None,
+               time_budget=None, maximize=None, maximize_tries=None):
+    """Check the decorated property with arbitrary values for each of
+    its annotated arguments. If isolate is True or an Isolation
+    instance, every trial runs in a separate worker process, and only
+    its result and statistics come back, not other changes it makes. If
+    threads is given, trials and shrinking run on a pool of that many
+    threads instead. The shrink_* arguments limit minimization of
+    failures, and are described in ShrinkState.
+    
+    If given, report is called with a Report once all trials pass. If
+    the property uses cover(), checking goes on past tries until the
+    coverage is met, up to max_cover_ratio times tries successes.
+    
+    Normally, checking stops at the first failure. With max_failures
+    above 1, it keeps going until that many distinct failures are
+    found, telling them apart by exception type and where they were
+    raised. One example of each is minimized, and they are raised
+    together as a MultipleFailures.
+    
+    With engine='choices', failures are shrunk by simplifying the
+    random choices that made them and generating them again, so specs
+    without a shrink() of their own shrink too. The resulting
+    QuickCheckError has a replay string, which can be given as replay
+    to run just that trial again.
+    
+    With mode='enumerate', the property is first checked on every
+    combination of values from series() up to depth, and then on
+    random values larger than that for whatever is left of tries.
+    Every combination is checked, even if there are more than tries.
+    Arguments whose specs have no series() are generated randomly for
+    each combination instead.
+    
+    If dedup is True, generated arguments that were already checked
+    are skipped rather than checked again, and don't count towards
+    tries. They are remembered in a Bloom filter, so a few new ones
+    are also skipped. After max_duplicates in a row, checking stops
+    early, as there are probably no new arguments left.
+    
+    If seed is given, the same arguments are generated on every run.
+    
+    If cache is given, as a Cache, a path, or True for the default
+    path, properties that passed before are skipped, or checked with
+    only cached_tries tries if that is not 0. Properties count as
+    unchanged if their code, specs, settings, seed and the arguments
+    they were called with are the same, and so is the source of every
+    module in modules. The cache is
+    only used when seed is given, as otherwise every run checks
+    different arguments.
+    
+    If track_memory is True, the memory each trial allocates is
+    measured with tracemalloc, and summed up in the Report. Trials
+    that allocate more than max_trial_memory bytes at their peak, or
+    that leave more than max_memory_growth more bytes allocated than
+    before, fail with MemoryLimitExceeded. Giving either of these
+    turns on track_memory.
+    
+    If time_budget is given, no new trials are started after that many
+    seconds, and the property passes if the trials so far did.
+    
+    The highest scores that trials report with target() are kept in
+    the Report, with their arguments. If maximize is given, as the
+    name of a target, or True for target()'s default name, then after
+    the usual trials, maximize_tries more (by default, tries) search
+    for arguments that score higher, by growing and shrinking the
+    highest scoring ones so far.
+    
+    The settings given here are kept on the decorated function, as
+    quickcheck_settings, so that runners can find properties and check
+    them again with some settings changed.
+    """
+    settings = dict(locals())
+    del settings['f']
+    if replay is not None:
+        engine = 'choices'
+    if engine not in ('values', 'choices'):
+        raise ValueError("unknown engine: {!r}".format(engine))
+    if mode not in ('random', 'enumerate'):
+        raise ValueError("unknown mode: {!r}".format(mode))
+    if isolate is True:
+        from .isolation import Isolation
+        isolate = Isolation()
+    if isolate and threads:
+        raise ValueError("isolate and threads cannot be used together")
+    if threads is not None and threads < 1:
+        raise ValueError("need at least one thread")
+    if max_trial_memory is not None or max_memory_growth is not None:
+        track_memory = True
+    if track_memory and (isolate or threads):
+        raise ValueError("track_memory cannot be used with isolate or threads")
+    if cache is not None and cache is not False:
+        from .cache import Cache
+        if cache is True:
+            cache = Cache()
+        elif not isinstance(cache, Cache):
+            cache = Cache(cache)
+    else:
+        cache = None
+    if seed is None:
+        # every run checks new arguments, so a pass says nothing about
+        # the arguments the next run will check
+        cache = None
+    
     def inner(*args, **kwargs):
-        i = 0
-        successes = 0
-        discards = 0
-        while successes < tries:
-            # compute size
-            size = i % max_size
-            
-            with sized(size):
-                kwargs_new = kwargs.copy()
-                used = {}
-                for name, spec in f.__annotations__.items():
-                    if name in kwargs:
-                        continue
-                    v = arbitrary(spec)
-                    kwargs_new[name] = v
-                    used[name] = v
-            
-                reemit_error = False
+        # only inspect the annotations once, not every trial
+        from .typehints import resolve
+        specs = {}
+        for name, annotation in f.__annotations__.items():
+            if name == 'return' or name in kwargs:
+                continue
+            specs[name] = resolve(annotation, f.__globals__)
+        
+        results = Report()
+        stats = results.statistics
+        failures = {}
+        failed_trials = 0
+        
+        budget = tries
+        if cache is not None and replay is None:
+            # everything that can change whether the property passes
+            settings = (tries, max_size, max_discard_ratio, max_cover_ratio,
+                        engine, mode, depth, seed, args, sorted(kwargs.items()),
+                        isolate, dedup, max_duplicates, track_memory, max_trial_memory,
+                        max_memory_growth, time_budget, maximize, maximize_tries)
+            key = cache.key(f, specs, modules, settings)
+            if not cache.full_run and cache.passed(key):
+                if not cached_tries:
+                    results.cached = True
+                    if report:
+                        report(results)
+                    return
+                budget = cached_tries
+        
+        started = time.monotonic()
+        
+        def out_of_time():
+            if time_budget is not None and time.monotonic() - started >= time_budget:
+                results.out_of_time = True
+            return results.out_of_time
+        
+        def more():
+            if out_of_time():
+                return False
+            return results.successes + failed_trials < budget or \
+                (stats.insufficient() and results.successes < budget * max_cover_ratio)
+        
+        def enumerable(spec):
+            try:
+                next(iter(series(spec, depth)), None)
+            except NotImplementedError:
+                return False
+            return True
+        
+        def enumeration():
+            from .implementations import _product
+            # the rest are generated randomly for each combination
+            names = [name for name in specs if enumerable(specs[name])]
+            if specs and not names:
+                return
+            factories = [functools.partial(series, specs[name], depth) for name in names]
+            for values in _product(factories):
+                yield dict(zip(names, values))
+        
+        def trials():
+            if replay is not None:
+                size, buffer = choices.decode(replay)
+                yield size, choices.ChoiceRandom(choices=buffer), None, False
+                return
+            # seeds come from one random, in this thread, so runs are
+            # reproducible however the trials are scheduled
+            source = random if seed is None else random.Random(seed)
+            first_size = 0
+            if mode == 'enumerate':
+                for values in enumeration():
+                    yield depth, random.Random(source.getrandbits(64)), values, False
+                if depth + 1 < max_size:
+                    first_size = depth + 1
+            i = 0
+            while more():
+                trial_seed = source.getrandbits(64)
+                size = first_size + i % (max_size - first_size)
+                if engine == 'choices':
+                    yield size, choices.ChoiceRandom(trial_seed), None, False
+                else:
+                    yield size, random.Random(trial_seed), None, False
+                i += 1
+            if search is not None:
+                while search.more() and not out_of_time():
+                    r = random.Random(source.getrandbits(64))
+                    proposal = search.propose(r)
+                    if proposal is None:
+                        break
+                    size, values = proposal
+                    yield size, r, values, True
+        
+        def generate():
+            kwargs_new = kwargs.copy()
+            used = {}
+            for name, spec in specs.items():
+                v = arbitrary(spec)
+                kwargs_new[name] = v
+                used[name] = v
+            return used, kwargs_new
+        
+        search = None
+        if maximize is not None and replay is None:
+            from .targeting import TargetSearch
+            search = TargetSearch(specs, '' if maximize is True else maximize,
+                                  tries if maximize_tries is None else maximize_tries, max_size)
+        
+        seen = None
+        if dedup and replay is None:
+            from .dedup import BloomFilter
+            seen = BloomFilter(budget * max(max_cover_ratio, 1))
+        
+        def run_trial(size, r, values, searched):
+            with seeded(r), sized(size):
+                if values is None:
+                    used, kwargs_new = generate()
+                else:
+                    used = {name: values[name] if name in values else arbitrary(spec)
+                            for name, spec in specs.items()}
+                    kwargs_new = kwargs.copy()
+                    kwargs_new.update(used)
+                if seen is not None:
+                    from .dedup import structural_hash
+                    if seen.add(structural_hash(used)):
+                        return size, r, used, None, None, None, values is not None, searched, True
+                with statistics.recording() as trial:
+                    try:
+                        ret, e = call(**kwargs_new), None
+                    except Exception as exc:
+                        ret, e = None, exc
+                    else:
+                        if tracker is not None:
+                            tracker.record(used)
+                return size, r, used, ret, trial, e, values is not None, searched, False
+        
+        def replay_choices(size, buffer):
+            r = choices.ChoiceRandom(choices=buffer)
+            with seeded(r), sized(size):
+                used, kwargs_new = generate()
                 try:
-                    ret = f(*args, **kwargs_new)
+                    call(**kwargs_new)
                 except Exception as e:
+                    return r, used, e
+            return r, used, None
+        
+        def shrink_choices(size, buffer, e, state, fingerprint):
+            def test(buffer):
+                try:
+                    r, used, e_new = replay_choices(size, buffer)
+                except Exception:
+                    # the choices don't make a value at all
+                    return None
+                if isinstance(e_new, type(e)) and \
+                   (fingerprint is None or _fingerprint(e_new) == fingerprint):
+                    return r.recorded
+                return None
+            return choices.minimize(test, buffer, state, executor, threads or 1)
+        
+        def sized_call(size):
+            # shrinking happens at the size the failure was found at
+            def with_size(**kwargs):
+                with sized(size):
+                    return call(**kwargs)
+            return with_size
+        
+        with contextlib.ExitStack() as stack:
+            call = functools.partial(f, *args)
+            executor = None
+            tracker = None
+            if isolate:
+                call = stack.enter_context(isolate.pool(call))
+            if track_memory:
+                from .memory import MemoryTracker
+                tracker = stack.enter_context(MemoryTracker(max_trial_memory, max_memory_growth))
+                results.memory = tracker.report
+                call = tracker.wrap(call)
+            if threads:
+                import concurrent.futures
+                executor = stack.enter_context(concurrent.futures.ThreadPoolExecutor(threads))
+                outcomes = _threaded(executor, run_trial, trials(), 2 * threads)
+                stack.callback(outcomes.close)
+            else:
+                outcomes = itertools.starmap(run_trial, trials())
+            
+            duplicates = 0
+            for size, r, used, ret, trial, e, enumerated, searched, duplicate in outcomes:
+                if not (enumerated or more()):
+                    # run ahead of time on another thread, but not needed
+                    break
+                
+                if duplicate:
+                    results.duplicates += 1
+                    duplicates += 1
+                    if duplicates >= max_duplicates:
+                        results.exhausted = True
+                        break
+                    continue
+                duplicates = 0
+                
+                if e is not None:
+                    failed_trials += 1
+                    fingerprint = _fingerprint(e)
+                    if fingerprint in failures:
+                        failures[fingerprint].occurrences += 1
+                        continue
+                    
                     # attempt to minimize
-                    used = _quickcheck_minimize(f, args, kwargs, used, type(e))
-                    reemit_error = True
+                    state = None
+                    if replay is None:
+                        state = ShrinkState(used, shrink_budget, shrink_timeout, max_shrink_calls,
+                                            shrink_progress, shrink_progress_interval)
+                    if engine == 'choices' and not enumerated:
+                        buffer = r.recorded
+                        if state is not None:
+                            buffer = shrink_choices(size, buffer, e, state,
+                                                    fingerprint if max_failures > 1 else None)
+                            _, used, e_new = replay_choices(size, buffer)
+                            e = e_new or e
+                            state.used = used
+                        err = QuickCheckError(used, state, results)
+                        err.__cause__ = e
+                        err.replay = choices.encode(size, buffer)
+                    else:
+                        used = _quickcheck_minimize(sized_call(size), (), kwargs, used, type(e), state, specs,
+                                                    fingerprint if max_failures > 1 else None,
+                                                    executor, threads or 1)
+                        err = _quickcheck_error(sized_call(size), kwargs, used, e, state, results)
+                    err.fingerprint = fingerprint
+                    failures[fingerprint] = err
+                    if len(failures) >= max_failures:
+                        break
+                    continue
                 
-                if reemit_error:
-                    kwargs_new.update(used)
-                    try:
-                        f(*args, **kwargs_new)
-                    except Exception as e:
-                        raise QuickCheckError(used) from e
-
                 if ret is None:
                     raise RuntimeError("received None from quickcheckified function")
+                
+                if searched:
+                    # the search steers these, so they'd skew the
+                    # statistics and coverage of the random trials
+                    results.searched += 1
+                    if ret:
+                        results.add_targets(trial, used)
+                    search.observe(used, trial if ret else None)
+                elif ret:
+                    results.successes += 1
+                    stats.add(trial)
+                    results.add_targets(trial, used)
+                    if search is not None:
+                        search.observe(used, trial)
+                else:
+                    results.discards += 1
+                    if search is not None:
+                        search.observe(used, None)
+                    if results.discards / (results.successes + 1) >= max_discard_ratio:
+                        raise RuntimeError("too many tests discarded, aborting")
             
-            i += 1
-            if ret:
-                successes += 1
-            else:
-                discards += 1
-                if discards / (successes + 1) >= max_discard_ratio:
-                    raise RuntimeError("too many tests discarded, aborting")
+            if cache is not None and replay is None:
+                if failures or stats.insufficient() or results.out_of_time:
+                    cache.forget(key)
+                else:
+                    cache.record(key, "{}.{}".format(f.__module__, f.__qualname__))
+            
+            if len(failures) == 1:
+                raise list(failures.values())[0]
+            if failures:
+                raise MultipleFailures(list(failures.values()), results)
+            if stats.insufficient():
+                raise CoverageError(results)
+            if report:
+                report(results)
     
+    inner.quickcheck_settings = settings
     return inner
@@ -0,0 +1,201 @@
+"""Generate values from a recorded sequence of random choices, so that
+a failure can be shrunk by simplifying the choices and generating
+again, whatever specs made it.
+"""
+
+import random
+
+__all__ = ['ChoiceRandom', 'Overrun', 'encode', 'decode', 'minimize']
+
+_FLOAT_BITS = 53
+
+class Overrun(Exception):
+    """Raised when a replayed generation keeps drawing long after its
+    choices ran out, which usually means it will never finish.
+    """
+    pass
+
+class ChoiceRandom(random.Random):
+    """A random.Random that records every choice it makes. Use it with
+    seeded(). Given a list of choices, it replays them instead, as
+    closely as they fit, and makes every choice after those 0. Lower
+    choices make simpler values, for all the specs in quickcheck. The
+    choices made so far are in recorded.
+    """
+    def __init__(self, seed=None, choices=None, max_overrun=10000):
+        self.replaying = choices is not None
+        self.buffer = choices
+        self.max_overrun = max_overrun
+        self.recorded = []
+        self.index = 0
+        super().__init__(seed)
+
+    def _choose(self, bits, fresh):
+        if not self.replaying:
+            v = fresh()
+            self.recorded.append(v)
+            return v
+        i = self.index
+        self.index += 1
+        if i >= len(self.buffer):
+            if i - len(self.buffer) >= self.max_overrun:
+                raise Overrun("ran out of choices")
+            return 0
+        v = min(self.buffer[i], (1 << bits) - 1)
+        self.recorded.append(v)
+        return v
+
+    def random(self):
+        v = self._choose(_FLOAT_BITS, lambda: super(ChoiceRandom, self).getrandbits(_FLOAT_BITS))
+        return v * 2.0 ** -_FLOAT_BITS
+
+    def getrandbits(self, k):
+        return self._choose(k, lambda: super(ChoiceRandom, self).getrandbits(k))
+
+def _varint(n, out):
+    while True:
+        b = n & 0x7f
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+def encode(size, choices):
+    """Pack a trial size and its choices into a short string."""
+    import base64
+    out = bytearray()
+    _varint(size, out)
+    for v in choices:
+        _varint(v, out)
+    return base64.urlsafe_b64encode(bytes(out)).decode('ascii').rstrip('=')
+
+def decode(s):
+    """Unpack a string made by encode() into (size, choices)."""
+    import base64
+    data = base64.urlsafe_b64decode(s + '=' * (-len(s) % 4))
+    values = []
+    n = shift = 0
+    for b in data:
+        n |= (b & 0x7f) << shift
+        shift += 7
+        if not b & 0x80:
+            values.append(n)
+            n = shift = 0
+    if shift or not values:
+        raise ValueError("not an encoded trial: {!r}".format(s))
+    return values[0], values[1:]
+
+def _sortkey(choices):
+    # shorter is simpler, then lower
+    return (len(choices), choices)
+
+class _Minimizer:
+    def __init__(self, test, choices, state, executor, batch_size):
+        self.test = test
+        self.choices = choices
+        self.state = state
+        self.executor = executor
+        self.batch_size = batch_size
+        self.seen = set()
+
+    def consider(self, candidates):
+        """Run the candidates that are simpler than the current choices,
+        and take the first that still fails. Returns its index in
+        candidates, or None.
+        """
+        key = _sortkey(self.choices)
+        fresh = []
+        for i, c in enumerate(candidates):
+            t = tuple(c)
+            if t not in self.seen and _sortkey(c) < key:
+                self.seen.add(t)
+                fresh.append((i, c))
+        fresh = fresh[:self.state.batch(len(fresh))]
+        if not fresh:
+            return None
+        if self.executor is None:
+            results = map(self.test, [c for _, c in fresh])
+        else:
+            results = self.executor.map(self.test, [c for _, c in fresh])
+        hit = None
+        for (i, c), result in zip(fresh, results):
+            if result is not None and hit is None:
+                self.choices = result
+                self.state.called(True)
+                hit = i
+            else:
+                self.state.called(False)
+        return hit
+
+    def delete_blocks(self, k):
+        i = len(self.choices) - k
+        while i >= 0 and not self.state.exhausted():
+            starts = range(i, max(i - self.batch_size, -1), -1)
+            c = self.choices
+            hit = self.consider([c[:j] + c[j + k:] for j in starts])
+            if hit is None:
+                i -= len(starts)
+            else:
+                i = min(starts[hit] - 1, len(self.choices) - k)
+
+    def zero_blocks(self, k):
+        i = 0
+        while i + k <= len(self.choices) and not self.state.exhausted():
+            starts = range(i, min(i + self.batch_size, len(self.choices) - k + 1))
+            c = self.choices
+            hit = self.consider([c[:j] + [0] * k + c[j + k:] for j in starts])
+            if hit is None:
+                i += len(starts)
+            else:
+                i = starts[hit] + k
+
+    def lower(self, i):
+        def lowered(v):
+            c = list(self.choices)
+            c[i] = v
+            return c
+        if self.consider([lowered(0)]) is not None:
+            return
+        # binary search between a value that passes and one that fails
+        lo, hi = 0, self.choices[i]
+        while hi - lo > 1 and not self.state.exhausted():
+            mid = (lo + hi) // 2
+            if self.consider([lowered(mid)]) is None:
+                lo = mid
+            elif i < len(self.choices):
+                hi = self.choices[i]
+            else:
+                break
+
+    def lower_values(self):
+        i = 0
+        while i < len(self.choices) and not self.state.exhausted():
+            if self.choices[i]:
+                self.lower(i)
+            i += 1
+
+    def run(self):
+        while not self.state.exhausted():
+            before = self.choices
+            for k in (8, 4, 2, 1):
+                self.delete_blocks(k)
+            for k in (8, 4, 2, 1):
+                self.zero_blocks(k)
+            self.lower_values()
+            if self.choices == before:
+                self.state.reason = 'minimal'
+                break
+        self.state.stop()
+        return self.choices
+
+def minimize(test, choices, state, executor=None, batch_size=1):
+    """Find the simplest choices that test() still accepts, starting
+    from choices, by deleting and zeroing blocks of them and lowering
+    single choices. test is called with a list of choices, and returns
+    None to reject them, or the choices actually used to accept
+    them. state is a ShrinkState. If executor is given, up to
+    batch_size candidates are tested on it at a time.
+    """
+    return _Minimizer(test, choices, state, executor, batch_size).run()
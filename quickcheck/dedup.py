@@ -0,0 +1,93 @@
+"""Notice when the same arguments are generated more than once, using
+a fixed amount of memory.
+"""
+
+import hashlib
+import math
+import threading
+
+__all__ = ['structural_hash', 'BloomFilter']
+
+def _feed(h, v, path):
+    h.update(type(v).__qualname__.encode('utf-8'))
+    if isinstance(v, str):
+        data = v.encode('utf-8', 'surrogatepass')
+        h.update(b'%d:' % len(data))
+        h.update(data)
+    elif isinstance(v, (bytes, bytearray, memoryview)):
+        h.update(b'%d:' % len(v))
+        h.update(v)
+    elif id(v) in path:
+        # a container inside itself; say how many levels up
+        h.update(b'^%d' % (len(path) - path[id(v)]))
+    elif isinstance(v, (list, tuple)):
+        path[id(v)] = len(path)
+        h.update(b'(')
+        for x in v:
+            _feed(h, x, path)
+        h.update(b')')
+        del path[id(v)]
+    elif isinstance(v, (dict, set, frozenset)):
+        # these don't have an order, so hash their items separately and
+        # put the hashes in one
+        path[id(v)] = len(path)
+        items = v.items() if isinstance(v, dict) else v
+        h.update(b'{')
+        for digest in sorted(_digest(x, path) for x in items):
+            h.update(digest)
+        h.update(b'}')
+        del path[id(v)]
+    elif hasattr(v, '__dict__') and not callable(v):
+        path[id(v)] = len(path)
+        _feed(h, vars(v), path)
+        del path[id(v)]
+    else:
+        data = repr(v).encode('utf-8', 'surrogatepass')
+        h.update(b'%d:' % len(data))
+        h.update(data)
+
+def _digest(value, path):
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, value, path)
+    return h.digest()
+
+def structural_hash(value):
+    """A hash of value that is the same for equal values of the same
+    types, across runs, unlike hash(). Values that contain themselves
+    are hashed by where the cycle leads back to.
+    """
+    # ids of the containers being hashed, from the outside in, to
+    # notice cycles
+    return _digest(value, {})
+
+class BloomFilter:
+    """A set of hashes that may wrongly claim to contain a hash it was
+    never given, about error_rate of the time once it holds capacity
+    of them, but never the other way around.
+    """
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.nbits = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.nhashes = max(int(round(self.nbits / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.nbits + 7) // 8)
+        self.lock = threading.Lock()
+
+    def _positions(self, digest):
+        # double hashing, from two halves of the digest
+        a = int.from_bytes(digest[:8], 'little')
+        b = int.from_bytes(digest[8:16], 'little') | 1
+        return [(a + i * b) % self.nbits for i in range(self.nhashes)]
+
+    def add(self, digest):
+        """Add a digest from structural_hash(), and return whether it
+        (probably) was already there.
+        """
+        positions = self._positions(digest)
+        with self.lock:
+            seen = True
+            for p in positions:
+                byte, bit = divmod(p, 8)
+                if not self.bits[byte] & (1 << bit):
+                    seen = False
+                    self.bits[byte] |= 1 << bit
+            return seen
@@ -0,0 +1,156 @@
+"""Check that a faster implementation of a function gives the same
+results as a reference one, and measure how much faster it is.
+"""
+
+from .checker import quickcheck
+from .statistics import _current as _current_trial
+from .typehints import resolve
+
+import copy
+import inspect
+import math
+import statistics
+import time
+
+__all__ = ['NotEquivalent', 'EquivalenceReport', 'equivalent']
+
+class NotEquivalent(AssertionError):
+    """Raised inside a trial when the two implementations disagree."""
+    def __init__(self, fast, reference):
+        super().__init__("fast gave {!r}, but reference gave {!r}".format(fast, reference))
+        self.fast = fast
+        self.reference = reference
+
+class EquivalenceReport:
+    """The speedups of fast over reference, one for each trial where
+    they agreed, as reference time over fast time.
+    """
+    def __init__(self):
+        self.speedups = []
+
+    def percentile(self, p):
+        s = sorted(self.speedups)
+        if not s:
+            return math.nan
+        return s[min(int(p / 100 * len(s)), len(s) - 1)]
+
+    @property
+    def median(self):
+        return statistics.median(self.speedups) if self.speedups else math.nan
+
+    @property
+    def geometric_mean(self):
+        if not self.speedups:
+            return math.nan
+        return math.exp(statistics.mean(math.log(s) for s in self.speedups))
+
+    def __str__(self):
+        return "{} trials, speedup median {:.2f}x (geometric mean {:.2f}x, " \
+               "10%-90% {:.2f}x-{:.2f}x, min {:.2f}x)".format(
+                   len(self.speedups), self.median, self.geometric_mean,
+                   self.percentile(10), self.percentile(90), self.percentile(0))
+
+def _close(a, b, tolerance):
+    if isinstance(a, float) or isinstance(b, float):
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            if math.isnan(a) and math.isnan(b):
+                return True
+            return math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return type(a) == type(b) and len(a) == len(b) and \
+            all(_close(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k], tolerance) for k in a)
+    return a == b
+
+def _copy(v):
+    try:
+        return copy.deepcopy(v)
+    except (TypeError, copy.Error):
+        # like memoryviews; hope they aren't modified
+        return v
+
+def _timed(fn, args, kwargs, batch):
+    # every call gets its own copy, so that none of them see what an
+    # earlier one did to the arguments, and copying isn't timed
+    elapsed = 0.0
+    for _ in range(batch):
+        call_args = [_copy(v) for v in args]
+        call_kwargs = {name: _copy(v) for name, v in kwargs.items()}
+        start = time.perf_counter()
+        result = fn(*call_args, **call_kwargs)
+        elapsed += time.perf_counter() - start
+    return result, elapsed / batch
+
+def _outcome(fn, args, kwargs, batch):
+    try:
+        result, elapsed = _timed(fn, args, kwargs, batch)
+    except Exception as e:
+        return ('raise', type(e)), None
+    return ('return', result), elapsed
+
+def equivalent(fast, reference, args=None, key=None, tolerance=None, batch=1, report=None, **options):
+    """Check that fast and reference return the same results on the
+    same arbitrary arguments, or raise the same type of exception, and
+    return an EquivalenceReport of how much faster fast was.
+
+    args gives the specs for the arguments, as a list for positional
+    ones or a dict for keyword ones. By default, the annotations of
+    fast are used. If given, results are passed through key before
+    they are compared. If tolerance is given, floats anywhere in the
+    results only need to be that close, relatively or absolutely.
+    Each implementation is called batch times per trial, for a more
+    precise time, each time on its own copy of the arguments. Only
+    trials count towards the speedups, not the calls made while
+    shrinking.
+
+    Disagreements raise a QuickCheckError with the shrunk arguments,
+    caused by a NotEquivalent. Other options are passed on to
+    quickcheck(), and report, if given, is called with the
+    EquivalenceReport. With isolate, the trials run in worker
+    processes, so they are checked but no speedups are recorded.
+    """
+    if args is None:
+        args = {name: annotation for name, annotation in fast.__annotations__.items()
+                if name != 'return'}
+    if isinstance(args, dict):
+        names = list(args)
+        positional = False
+    else:
+        names = ['arg{}'.format(i) for i in range(len(args))]
+        args = dict(zip(names, args))
+        positional = True
+
+    results = EquivalenceReport()
+
+    def prop(**kwargs):
+        if positional:
+            call_args, call_kwargs = [kwargs[name] for name in names], {}
+        else:
+            call_args, call_kwargs = [], kwargs
+        expected, ref_time = _outcome(reference, call_args, call_kwargs, batch)
+        got, fast_time = _outcome(fast, call_args, call_kwargs, batch)
+
+        if expected[0] == got[0] == 'return':
+            a, b = got[1], expected[1]
+            if key is not None:
+                a, b = key(a), key(b)
+            same = _close(a, b, tolerance) if tolerance is not None else a == b
+        else:
+            same = expected == got
+        if not same:
+            raise NotEquivalent(got[1], expected[1])
+        if ref_time is not None and fast_time is not None and _current_trial() is not None:
+            results.speedups.append(ref_time / max(fast_time, 1e-9))
+        return True
+
+    prop.__name__ = prop.__qualname__ = getattr(fast, '__name__', 'fast')
+    # string annotations refer to names where fast was defined, not here
+    namespace = getattr(inspect.unwrap(fast), '__globals__', None)
+    prop.__annotations__ = {name: resolve(spec, namespace) if isinstance(spec, str) else spec
+                            for name, spec in args.items()}
+
+    quickcheck(**options)(prop)()
+    if report:
+        report(results)
+    return results
@@ -2,6 +2,9 @@
 
 from .decorator import decorator
 
+import sys
+import importlib
+
 __all__ = ['generic']
 
 class SingleDispatchGeneric:
@@ -12,38 +15,65 @@ class SingleDispatchGeneric:
     self.register(impl, typ) and then self(obj), impl will be used if
     and only if checker(obj, typ) is true. Good examples of checker
     are issubclass and isinstance.
+    
+    If defaults names a module, implementations registered from that
+    module are only tried after all the others, and the module is not
+    imported until a call finds no implementation at all.
     """
-    def __init__(self, dispatcher, checker):
+    def __init__(self, dispatcher, checker, defaults=None):
         self.dispatcher = dispatcher
         self.checker = checker
+        self.defaults = defaults
         self.implementations = []
+        self.default_implementations = []
     
     @decorator
     def register(fn, self, typ, checker=None):
         if not checker:
             checker = self.checker
-        self.implementations.insert(0, (typ, fn, checker))
+        if self.defaults is not None and fn.__module__ == self.defaults:
+            self.default_implementations.insert(0, (typ, fn, checker))
+        else:
+            self.implementations.insert(0, (typ, fn, checker))
         return fn
-        
-    def __call__(self, obj, *args, **kwargs):
-        for typ, impl, checker in self.implementations:
-            try:
-                if not checker(obj, typ):
+    
+    def find(self, obj):
+        """Return the implementation that would be used for obj, or None."""
+        for implementations in (self.implementations, self.default_implementations):
+            for typ, impl, checker in implementations:
+                try:
+                    if not checker(obj, typ):
+                        continue
+                except Exception:
+                    # some of our checkers will raise exceptions when mixed
+                    # like mixing isinstance and issubclass
                     continue
-            except Exception:
-                # some of our checkers will raise exceptions when mixed
-                # like mixing isinstance and issubclass
-                continue
-            return self.dispatcher(impl, obj, *args, **kwargs)
-        return self.dispatcher(None, obj, *args, **kwargs)
+                return impl
+        return None
+    
+    def load_defaults(self):
+        """Import the defaults module, if it hasn't been already. Returns
+        True if this imported it.
+        """
+        if self.defaults is None or self.defaults in sys.modules:
+            return False
+        importlib.import_module(self.defaults)
+        return True
+    
+    def __call__(self, obj, *args, **kwargs):
+        impl = self.find(obj)
+        if impl is None and self.load_defaults():
+            impl = self.find(obj)
+        return self.dispatcher(impl, obj, *args, **kwargs)
 
 @decorator
-def generic(dispatcher, checker):
+def generic(dispatcher, checker, defaults=None):
     """Decorator for making a single-dispatch function out of a
     implementation dispatcher.
     """
-    obj = SingleDispatchGeneric(dispatcher, checker)
+    obj = SingleDispatchGeneric(dispatcher, checker, defaults)
     def inner(*args, **kwargs):
         return obj(*args, **kwargs)
     inner.register = obj.register
+    inner.find = obj.find
     return inner
@@ -0,0 +1,187 @@
+"""Check how the running time of a property grows with the size of
+its arguments, to catch accidentally quadratic code.
+"""
+
+from .decorator import decorator
+from .interface import arbitrary, sized, seeded
+
+import math
+import random
+import statistics
+import time
+
+__all__ = ['ComplexityError', 'ComplexityReport', 'complexity']
+
+# log of each growth model, from slowest growing to fastest
+_models = [
+    ('1', lambda n: 0.0),
+    ('log n', lambda n: math.log(math.log2(n + 1))),
+    ('n', lambda n: math.log(n)),
+    ('n log n', lambda n: math.log(n) + math.log(math.log2(n + 1))),
+    ('n^2', lambda n: 2 * math.log(n)),
+    ('n^3', lambda n: 3 * math.log(n)),
+    ('2^n', lambda n: n * math.log(2)),
+]
+_model_names = [name for name, _ in _models]
+
+def _model_name(expected):
+    name = expected.strip()
+    if name.startswith('O(') and name.endswith(')'):
+        name = name[2:-1]
+    name = name.replace('**', '^').replace('²', '^2').replace('³', '^3')
+    name = ' '.join(name.replace('log', ' log ').split())
+    if name not in _model_names:
+        raise ValueError("unknown complexity {!r}, expected one of {}".format(
+            expected, ", ".join(_model_names)))
+    return name
+
+def _log_growth(name, n):
+    return dict(_models)[name](max(n, 1))
+
+def _fit(measurements):
+    """The model from _models that best fits measurements, a list of
+    (n, seconds), as seconds = a + c * model(n). This is a least
+    squares fit of the relative error, so that the constant overhead
+    of a call doesn't hide the growth at small n.
+    """
+    best = None
+    for name, log_g in _models:
+        logs = [log_g(max(n, 1)) for n, _ in measurements]
+        if max(logs) > 700:
+            # too big for a float
+            continue
+        S = Sg = Sgg = St = Sgt = 0.0
+        for lg, (_, t) in zip(logs, measurements):
+            g = math.exp(lg)
+            w = 1 / (t * t)
+            S += w
+            Sg += w * g
+            Sgg += w * g * g
+            St += w * t
+            Sgt += w * g * t
+        det = S * Sgg - Sg * Sg
+        if det <= 1e-12 * S * Sgg:
+            a, c = St / S, 0.0
+        else:
+            c = (S * Sgt - Sg * St) / det
+            a = (St - c * Sg) / S
+            if a < 0:
+                a, c = 0.0, Sgt / Sgg
+            if c < 0:
+                a, c = St / S, 0.0
+        error = sum(((t - a - c * math.exp(lg)) / t) ** 2 for lg, (_, t) in zip(logs, measurements))
+        if best is None or error < best[1]:
+            best = (name, error)
+    return best[0]
+
+class ComplexityReport:
+    """The result of a complexity() check: measurements holds (size,
+    n, seconds) for each size, and fitted is the name of the growth
+    model that fits them best.
+    """
+    def __init__(self, expected, measurements, fitted):
+        self.expected = expected
+        self.measurements = measurements
+        self.fitted = fitted
+
+    def __str__(self):
+        lines = ["expected O({}), fits O({})".format(self.expected, self.fitted)]
+        for size, n, t in self.measurements:
+            lines.append("n={:<8} {:.3g}s".format(n, t))
+        return "\n".join(lines)
+
+class ComplexityError(Exception):
+    """Raised when a property's running time grows faster than its
+    declared complexity. pair holds the smallest ((n, seconds), (n,
+    seconds)) that shows it, and report the ComplexityReport.
+    """
+    def __init__(self, report, pair):
+        (n1, t1), (n2, t2) = pair
+        expected_ratio = math.exp(_log_growth(report.expected, n2) - _log_growth(report.expected, n1))
+        super().__init__("expected O({}), but going from n={} to n={} took {:.1f}x as long, "
+                         "not {:.1f}x; fits O({})".format(report.expected, n1, n2, t2 / t1,
+                                                          expected_ratio, report.fitted))
+        self.report = report
+        self.pair = pair
+
+def _n(used, size):
+    n = 0
+    counted = False
+    for v in used.values():
+        try:
+            n += len(v)
+            counted = True
+        except TypeError:
+            pass
+    return n if counted else size
+
+@decorator
+def complexity(f, expected='n', sizes=(16, 32, 64, 128, 256, 512, 1024), samples=3,
+               repeats=5, warmup=1, tolerance=2.0, report=None, seed=None, timer=time.perf_counter):
+    """Time the decorated property on arbitrary arguments at each of
+    sizes, and fail with ComplexityError if its running time grows
+    faster than expected, one of "1", "log n", "n", "n log n", "n^2",
+    "n^3" or "2^n".
+
+    n is the total len() of the arguments, or the size if none of them
+    have one. At each size, samples sets of arguments are each run
+    warmup times and then timed repeats times, keeping the fastest
+    time, and the median of those is used. It fails if the best
+    fitting model grows faster than expected, and some pair of sizes
+    at least twice apart in n took more than tolerance times longer
+    than expected. If given, report is called with a ComplexityReport
+    otherwise.
+
+    If seed is given, the same arguments are generated on every run.
+    timer is called before and after each timed call, and may count
+    something other than seconds, like operations done, for a check
+    that doesn't depend on how busy the machine is.
+    """
+    expected = _model_name(expected)
+
+    def inner(*args, **kwargs):
+        from .typehints import resolve
+        specs = {}
+        for name, annotation in f.__annotations__.items():
+            if name == 'return' or name in kwargs:
+                continue
+            specs[name] = resolve(annotation, f.__globals__)
+
+        source = random if seed is None else random.Random(seed)
+        measurements = []
+        for size in sizes:
+            ns = []
+            times = []
+            for _ in range(samples):
+                with seeded(source.getrandbits(64)), sized(size):
+                    used = {name: arbitrary(spec) for name, spec in specs.items()}
+                    kwargs_new = kwargs.copy()
+                    kwargs_new.update(used)
+                    for _ in range(warmup):
+                        f(*args, **kwargs_new)
+                    best = None
+                    for _ in range(repeats):
+                        start = timer()
+                        f(*args, **kwargs_new)
+                        elapsed = timer() - start
+                        if best is None or elapsed < best:
+                            best = elapsed
+                ns.append(_n(used, size))
+                times.append(max(best, 1e-9))
+            measurements.append((size, statistics.median(ns), statistics.median(times)))
+
+        points = sorted((n, t) for _, n, t in measurements)
+        result = ComplexityReport(expected, measurements, _fit(points))
+        if _model_names.index(result.fitted) > _model_names.index(expected):
+            # find the closest pair of sizes that shows it
+            pairs = [(b, a) for i, a in enumerate(points) for b in points[i + 1:]
+                     if b[0] >= 2 * max(a[0], 1)]
+            pairs.sort(key=lambda p: (p[0][0], -p[1][0]))
+            for (n2, t2), (n1, t1) in pairs:
+                allowed = math.exp(_log_growth(expected, n2) - _log_growth(expected, n1))
+                if t2 / t1 > tolerance * allowed:
+                    raise ComplexityError(result, ((n1, t1), (n2, t2)))
+        if report:
+            report(result)
+
+    return inner
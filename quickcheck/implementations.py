@@ -1,24 +1,22 @@
 """Default implementations for arbitrary() and shrink()."""
 
-from .interface import arbitrary, shrink
+from .interface import ArbitrarySpec, arbitrary, shrink, shrink_spec, shrink_passes, split_size, sized, rng, series, grow, grow_spec
 from .decorator import decorator
 from .roundrobin import roundrobin
 
-import random
 import math
 import copy
+import threading
 
-__all__ = ['shrink_sequence']
+__all__ = ['shrink_sequence', 'sequence_passes']
 
-def shrink_sequence(v, factory=None):
-    """Yields 1-element smaller subsequences, and subsequences where 1
-    element has been simplified. If provided, factory must produce a
-    sequence out of something returned by v[i]. By default, factory(x)
-    = type(v)([x]).
-    """
-    if factory is None:
-        factory = lambda x: type(v)([x])
-    
+def _halves(v):
+    n = len(v)
+    if n > 2:
+        yield v[:n // 2]
+        yield v[n // 2:]
+
+def _deletions(v):
     for i in range(len(v)):
         vc = copy.copy(v)
         try:
@@ -27,9 +25,10 @@ def shrink_sequence(v, factory=None):
             # immutable sequences. gotta love 'em.
             vc = vc[:i] + vc[i+1:]
         yield vc
-    
+
+def _simplifications(v, factory, shrinker):
     def makeshrinks(i):
-        for s in shrink(v[i]):
+        for s in shrinker(v[i]):
             vc = copy.copy(v)
             try:
                 vc[i] = s
@@ -38,15 +37,58 @@ def shrink_sequence(v, factory=None):
                 vc = vc[:i] + factory(s) + vc[i+1:]
             yield vc
     
-    for x in roundrobin(*(makeshrinks(i) for i in range(len(v)))):
-        yield x
+    return roundrobin(*(makeshrinks(i) for i in range(len(v))))
 
-class ArbitrarySpec:
-    """Can be used in place of a type name in arbitrary(), for when
-    you need more control over generated values.
+def sequence_passes(v, factory=None, shrinker=shrink):
+    """The shrinks from shrink_sequence(), split into passes, as a list
+    of (name, iterable) pairs.
     """
-    def arbitrary(self, size=None):
-        raise NotImplementedError("{}.arbitrary".format(self.__class__.__name__))
+    if factory is None:
+        factory = lambda x: type(v)([x])
+    return [
+        ('halve', _halves(v)),
+        ('delete', _deletions(v)),
+        ('simplify', _simplifications(v, factory, shrinker)),
+    ]
+
+def shrink_sequence(v, factory=None, shrinker=shrink):
+    """Yields halves of the sequence, 1-element smaller subsequences,
+    and subsequences where 1 element has been simplified. If provided,
+    factory must produce a sequence out of something returned by
+    v[i]. By default, factory(x) = type(v)([x]). Elements are
+    simplified with shrinker.
+    """
+    for name, shrinks in sequence_passes(v, factory, shrinker):
+        for x in shrinks:
+            yield x
+
+def _product(factories, prefix=()):
+    # like itertools.product, but calls factories for a fresh iterable
+    # instead of keeping every value in memory
+    if not factories:
+        yield prefix
+        return
+    for v in factories[0]():
+        for t in _product(factories[1:], prefix + (v,)):
+            yield t
+
+def _fits(n):
+    # grown values stay within the size budget, like arbitrary() ones
+    with sized() as size:
+        return size is None or n <= size
+
+def _number_series(min, max, depth):
+    # numbers closest to 0, or the nearest bound, first
+    origin = 0
+    if min is not None and origin < min:
+        origin = min
+    if max is not None and origin > max:
+        origin = max
+    yield origin
+    for k in range(1, depth + 1):
+        for v in (origin + k, origin - k):
+            if (min is None or v >= min) and (max is None or v <= max):
+                yield v
 
 @arbitrary.register(ArbitrarySpec, checker=isinstance)
 def arbitrary_spec(spec, size=None):
@@ -57,26 +99,146 @@ def arbitrary_spec(spec, size=None):
     except TypeError:
         return spec.arbitrary()
 
+def _is_typehint(obj, _):
+    return type(obj).__module__ == 'typing' or type(obj).__name__ in ('GenericAlias', 'UnionType')
+
+@series.register(ArbitrarySpec, checker=isinstance)
+def series_spec(spec, depth):
+    return spec.series(depth)
+
+@arbitrary.register(None, checker=_is_typehint)
+def arbitrary_typehint(hint, size=None):
+    from .typehints import resolve
+    spec = resolve(hint)
+    if spec is hint:
+        raise NotImplementedError("arbitrary({})".format(hint))
+    return arbitrary(spec, size=size)
+
+@series.register(None, checker=_is_typehint)
+def series_typehint(hint, depth):
+    from .typehints import resolve
+    spec = resolve(hint)
+    if spec is hint:
+        raise NotImplementedError("series({})".format(hint))
+    return series(spec, depth)
+
 class Constant(ArbitrarySpec):
     def __init__(self, v):
         self.v = v
     
     def arbitrary(self):
         return self.v
+    
+    def series(self, depth):
+        return [self.v]
+    
+    def shrink(self, v):
+        return []
+
+class _AliasTable:
+    """Walker's alias method: after O(n) setup, picks an index with
+    probability proportional to its weight in O(1), from a single
+    random() draw.
+    """
+    def __init__(self, weights):
+        weights = [float(w) for w in weights]
+        if any(w < 0 for w in weights):
+            raise ValueError("weights can't be negative")
+        total = sum(weights)
+        if not total > 0:
+            raise ValueError("weights must add up to more than 0")
+        n = len(weights)
+        self.n = n
+        self.weights = weights
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            # only rounding error is left
+            self.prob[i] = 1.0
+    
+    def __repr__(self):
+        # the same from one run to the next, for cache keys
+        return "_AliasTable({!r})".format(self.weights)
+    
+    def sample(self, r):
+        u = r.random() * self.n
+        i = int(u)
+        if u - i < self.prob[i]:
+            return i
+        return self.alias[i]
 
 class Choice(ArbitrarySpec):
-    def __init__(self, first, *values):
+    """One of the given values. If weights are given, each value is
+    picked in proportion to its weight, otherwise they are all equally
+    likely.
+    """
+    def __init__(self, first, *values, weights=None):
         self.values = [first] + list(values)
+        self.table = None
+        if weights is not None:
+            if len(weights) != len(self.values):
+                raise ValueError("need one weight for each value")
+            self.table = _AliasTable(weights)
     
     def arbitrary(self):
-        return random.choice(self.values)
+        if self.table is None:
+            return rng().choice(self.values)
+        return self.values[self.table.sample(rng())]
+    
+    def series(self, depth):
+        if self.table is None:
+            return iter(self.values)
+        return (v for v, p in zip(self.values, self.table.weights) if p)
+    
+    def shrink(self, v):
+        # earlier values are simpler, but never ones that can't be picked
+        weights = self.table.weights if self.table is not None else [1] * len(self.values)
+        for x, p in zip(self.values, weights):
+            if x == v:
+                break
+            if p:
+                yield x
 
 class Any(ArbitrarySpec):
-    def __init__(self, first, *specs):
+    """A value from one of the given specs. Like Choice, the specs can
+    be weighted.
+    """
+    def __init__(self, first, *specs, weights=None):
         self.specs = [first] + list(specs)
+        self.table = None
+        if weights is not None:
+            if len(weights) != len(self.specs):
+                raise ValueError("need one weight for each spec")
+            self.table = _AliasTable(weights)
     
     def arbitrary(self):
-        return arbitrary(random.choice(self.specs))
+        if self.table is None:
+            return arbitrary(rng().choice(self.specs))
+        return arbitrary(self.specs[self.table.sample(rng())])
+    
+    def series(self, depth):
+        specs = self.specs
+        if self.table is not None:
+            specs = [spec for spec, p in zip(specs, self.table.weights) if p]
+        return roundrobin(*(series(spec, depth) for spec in specs))
+
+class Frequency(Any):
+    """A value from one of the specs in (weight, spec) pairs, picked in
+    proportion to the weights. Picking is O(1) however many specs there
+    are.
+    """
+    def __init__(self, first, *pairs):
+        pairs = [first] + list(pairs)
+        super().__init__(*[spec for _, spec in pairs], weights=[weight for weight, _ in pairs])
 
 class Maybe(ArbitrarySpec):
     def __init__(self, spec, none_chance=0.1):
@@ -84,16 +246,120 @@ class Maybe(ArbitrarySpec):
         self.none_chance = none_chance
     
     def arbitrary(self):
-        if random.random() < self.none_chance:
+        if rng().random() < self.none_chance:
             return None
         return arbitrary(self.spec)
+    
+    def series(self, depth):
+        yield None
+        for v in series(self.spec, depth):
+            yield v
+    
+    def shrink(self, v):
+        if v is not None:
+            yield None
+            for x in shrink_spec(self.spec, v):
+                yield x
+    
+    def grow(self, v):
+        if v is None:
+            return [arbitrary(self.spec)]
+        return grow_spec(self.spec, v)
+
+class Deferred(ArbitrarySpec):
+    """A spec that is built by calling fn the first time it is needed,
+    so that specs can refer to specs defined later, or to themselves.
+    Each level of a self-referencing Deferred gets one less size.
+    """
+    def __init__(self, fn):
+        self.fn = fn
+        self._spec = None
+    
+    @property
+    def spec(self):
+        if self._spec is None:
+            self._spec = self.fn()
+        return self._spec
+    
+    def arbitrary(self, size=30):
+        return arbitrary(self.spec, size=max(size - 1, 0))
+    
+    def series(self, depth):
+        if depth > 0:
+            return series(self.spec, depth - 1)
+        return []
+    
+    def shrink(self, v):
+        return shrink_spec(self.spec, v)
+
+class Recursive(ArbitrarySpec):
+    """Tree-shaped values. leaf is the spec for the base case, and
+    extend is called with this spec to make the spec for the recursive
+    case, like Recursive(int, lambda tree: List(tree)). Each level
+    down gets one less size and is more likely to be a leaf, and
+    leaves are always used once the size or max_depth runs out.
+    """
+    def __init__(self, leaf, extend, max_depth=None):
+        self.leaf = leaf
+        self.max_depth = max_depth
+        self.local = threading.local()
+        self.branch = extend(self)
+    
+    def arbitrary(self, size=30):
+        depth = getattr(self.local, 'depth', 0)
+        if size <= 0 or (self.max_depth is not None and depth >= self.max_depth) \
+           or rng().random() < depth / (depth + 1):
+            return arbitrary(self.leaf, size=size)
+        
+        self.local.depth = depth + 1
+        try:
+            return arbitrary(self.branch, size=size - 1)
+        finally:
+            self.local.depth = depth
+    
+    def series(self, depth):
+        for v in series(self.leaf, depth):
+            yield v
+        if depth > 0:
+            for v in series(self.branch, depth - 1):
+                yield v
+    
+    def leaves(self, v):
+        # the simplest leaf, the same every time
+        try:
+            leaf = next(iter(series(self.leaf, 0)))
+        except (NotImplementedError, StopIteration):
+            return
+        if v != leaf:
+            yield leaf
+    
+    def shrink_passes(self, v):
+        # first try replacing the whole tree with a leaf
+        passes = [('leaf', self.leaves(v))]
+        if not isinstance(v, (list, tuple)):
+            passes.append(('shrink', shrink_spec(self.leaf, v)))
+            return passes
+        
+        # then try the subtrees on their own, and then shrinking it as
+        # a branch, which shrinks the subtrees with this spec in turn
+        passes.append(('subtree', (child for child in v if type(child) is type(v))))
+        return passes + shrink_passes(self.branch, v)
+    
+    def shrink(self, v):
+        for name, shrinks in self.shrink_passes(v):
+            for x in shrinks:
+                yield x
 
 @arbitrary.register(None, checker=lambda a, b: a is b)
 def arbitrary_none(_):
     return None
 
+@series.register(None, checker=lambda a, b: a is b)
+def series_none(_, depth):
+    return [None]
+
 class Float(ArbitrarySpec):
-    def __init__(self, min=None, max=None, add_sign=True, distribution=lambda: random.random()):
+    def __init__(self, min=None, max=None, add_sign=True, distribution=lambda: rng().random()):
         self.min = min
         self.max = max
         self.add_sign = add_sign
@@ -121,7 +387,7 @@ class Float(ArbitrarySpec):
             mult = - size
         
         if add_sign:
-            mult *= random.choice([-1, 1])
+            mult *= rng().choice([-1, 1])
         
         # clamp mult to size
         if mult > size:
@@ -142,11 +408,49 @@ class Float(ArbitrarySpec):
                 continue
             
             return f
+    
+    def bounds(self):
+        """The (min, max) that values lie between, either maybe None."""
+        return self.min, self.max
+    
+    def series(self, depth):
+        return (float(v) for v in _number_series(self.min, self.max, depth))
+    
+    def grow(self, v):
+        if math.isinf(v) or math.isnan(v):
+            return
+        # away from 0, or the nearest bound, like series() goes
+        min, max = self.bounds()
+        origin = 0
+        if min is not None and origin < min:
+            origin = min
+        if max is not None and origin > max:
+            origin = max
+        d = v - origin
+        candidates = []
+        if d:
+            candidates.append(origin + 2 * d)
+        if d >= 0:
+            candidates.append(v + 1)
+        if d <= 0:
+            candidates.append(v - 1)
+        for x in candidates:
+            if x != v and (min is None or x >= min) and (max is None or x <= max) \
+               and _fits(abs(x - origin)):
+                yield x
 
 @arbitrary.register(float)
 def arbitrary_float(_):
     return arbitrary(Float())
 
+@series.register(float)
+def series_float(_, depth):
+    return series(Float(), depth)
+
+@grow.register(float)
+def grow_float(v):
+    return Float().grow(v)
+
 @shrink.register(float)
 def shrink_float(v):
     if v < 0:
@@ -159,11 +463,27 @@ def shrink_float(v):
 class Integer(Float):
     def arbitrary(self, size=0xffff):
         return int(round(super().arbitrary(size=size)))
+    
+    def bounds(self):
+        min = self.min if self.min is None else math.ceil(self.min)
+        max = self.max if self.max is None else math.floor(self.max)
+        return min, max
+    
+    def series(self, depth):
+        return _number_series(*self.bounds(), depth)
 
 @arbitrary.register(int)
 def arbitrary_int(_):
     return arbitrary(Integer())
 
+@series.register(int)
+def series_int(_, depth):
+    return series(Integer(), depth)
+
+@grow.register(int)
+def grow_int(v):
+    return Integer().grow(v)
+
 @shrink.register(int)
 def shrink_int(v):
     if v < 0:
@@ -186,11 +506,20 @@ def shrink_int(v):
 def arbitrary_bool(_):
     return arbitrary(Choice(True, False))
 
+@series.register(bool)
+def series_bool(_, depth):
+    return [False, True]
+
 @shrink.register(bool)
 def shrink_bool(v):
     if v:
         yield False
 
+@grow.register(bool)
+def grow_bool(v):
+    if not v:
+        yield True
+
 class Char(ArbitrarySpec):
     # turns out, this is hard
     # http://stackoverflow.com/a/1477572
@@ -203,31 +532,42 @@ class Char(ArbitrarySpec):
     @staticmethod
     def byte_range(first, last):
         return list(range(first, last + 1))
+    
+    # the simplest, then some that tend to be special
+    series_values = 'a 0\x00\u00e9\U0001f600'
+    
+    def series(self, depth):
+        return iter(self.series_values[:depth + 1])
 
     def arbitrary(self):
         byte_range = self.byte_range
-        first = random.choice(self.first_values)
+        choice = rng().choice
+        first = choice(self.first_values)
         ret = b''
         if first <= 0x7f:
             ret = bytes([first])
         elif first <= 0xDF:
-            ret = bytes([first, random.choice(self.trailing_values)])
+            ret = bytes([first, choice(self.trailing_values)])
         elif first == 0xE0:
-            ret = bytes([first, random.choice(byte_range(0xA0, 0xBF)), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(byte_range(0xA0, 0xBF)), choice(self.trailing_values)])
         elif first == 0xED:
-            ret = bytes([first, random.choice(byte_range(0x80, 0x9F)), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(byte_range(0x80, 0x9F)), choice(self.trailing_values)])
         elif first <= 0xEF:
-            ret = bytes([first, random.choice(self.trailing_values), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(self.trailing_values), choice(self.trailing_values)])
         elif first == 0xF0:
-            ret = bytes([first, random.choice(byte_range(0x90, 0xBF)), random.choice(self.trailing_values), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(byte_range(0x90, 0xBF)), choice(self.trailing_values), choice(self.trailing_values)])
         elif first <= 0xF3:
-            ret = bytes([first, random.choice(self.trailing_values), random.choice(self.trailing_values), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(self.trailing_values), choice(self.trailing_values), choice(self.trailing_values)])
         elif first == 0xF4:
-            ret = bytes([first, random.choice(byte_range(0x80, 0x8F)), random.choice(self.trailing_values), random.choice(self.trailing_values)])
+            ret = bytes([first, choice(byte_range(0x80, 0x8F)), choice(self.trailing_values), choice(self.trailing_values)])
         return str(ret, 'utf-8')
 
 class List(ArbitrarySpec):
-    def __init__(self, elspec, lengthmin=0, lengthmax=None):
+    """A list of elspec values. The size budget is split between the
+    elements, unless split is False, in which case every element gets
+    the whole size.
+    """
+    def __init__(self, elspec, lengthmin=0, lengthmax=None, split=True):
         if lengthmin is None:
             lengthmin = 0
         if lengthmax is not None and lengthmin > lengthmax:
@@ -239,10 +579,43 @@ class List(ArbitrarySpec):
         self.lengthmin = lengthmin
         self.lengthmax = lengthmax
         self.elspec = elspec
+        self.split = split
     
     def arbitrary(self, size=30):
         l = arbitrary(Integer(min=self.lengthmin, max=self.lengthmax), size=size)
-        return [arbitrary(self.elspec) for _ in range(l)]
+        if not self.split:
+            return [arbitrary(self.elspec) for _ in range(l)]
+        elsize = split_size(size, l)
+        return [arbitrary(self.elspec, size=elsize) for _ in range(l)]
+    
+    def series(self, depth):
+        lengthmax = self.lengthmin + depth
+        if self.lengthmax is not None:
+            lengthmax = min(lengthmax, self.lengthmax)
+        element = lambda: series(self.elspec, depth - 1)
+        for n in range(self.lengthmin, lengthmax + 1):
+            for t in _product([element] * n):
+                yield list(t)
+    
+    def shrink(self, v):
+        for name, shrinks in self.shrink_passes(v):
+            for x in shrinks:
+                yield x
+    
+    def shrink_passes(self, v):
+        passes = sequence_passes(v, shrinker=lambda x: shrink_spec(self.elspec, x))
+        if not self.lengthmin:
+            return passes
+        return [(name, (x for x in shrinks if len(x) >= self.lengthmin)) for name, shrinks in passes]
+    
+    def grow(self, v):
+        n = len(v)
+        if (self.lengthmax is None or n < self.lengthmax) and _fits(n + 1):
+            yield v + [arbitrary(self.elspec)]
+        if n and (self.lengthmax is None or 2 * n <= self.lengthmax) and _fits(2 * n):
+            yield v + v
+        for x in _simplifications(v, None, lambda x: grow_spec(self.elspec, x)):
+            yield x
 
 @arbitrary.register(list, checker=isinstance)
 def arbitrary_list(v):
@@ -252,28 +625,119 @@ def arbitrary_list(v):
 def shrink_list(v):
     return shrink_sequence(v)
 
+shrink_list.passes = sequence_passes
+
+@grow.register(list)
+def grow_list(v):
+    # without a spec, there's nothing to make new elements from
+    if v and _fits(2 * len(v)):
+        yield v + v
+    for x in _simplifications(v, None, grow):
+        yield x
+
 class Tuple(ArbitrarySpec):
-    def __init__(self, *specs):
+    """A tuple with one value from each spec. Like List, the size budget
+    is split between them unless split is False.
+    """
+    def __init__(self, *specs, split=True):
         self.specs = list(specs)
+        self.split = split
     
-    def arbitrary(self):
-        return tuple(arbitrary(spec) for spec in self.specs)
+    def arbitrary(self, size=None):
+        if not self.split:
+            return tuple(arbitrary(spec) for spec in self.specs)
+        elsize = split_size(size, len(self.specs))
+        return tuple(arbitrary(spec, size=elsize) for spec in self.specs)
+    
+    def series(self, depth):
+        factories = [lambda spec=spec: series(spec, depth) for spec in self.specs]
+        return _product(factories)
+    
+    def shrink(self, v):
+        def shrinki(i):
+            for s in shrink_spec(self.specs[i], v[i]):
+                yield v[:i] + (s,) + v[i+1:]
+        return roundrobin(*(shrinki(i) for i in range(len(self.specs))))
+    
+    def grow(self, v):
+        def growi(i):
+            for s in grow_spec(self.specs[i], v[i]):
+                yield v[:i] + (s,) + v[i+1:]
+        return roundrobin(*(growi(i) for i in range(len(self.specs))))
 
 @arbitrary.register(tuple, checker=isinstance)
 def arbitrary_tuple(v):
     return arbitrary(Tuple(*v))
 
 @shrink.register(tuple)
-def shrink_tuple(v):
+def shrink_tuple(v, shrinker=shrink):
     def shrinki(i):
-        for s in shrink(v[i]):
+        for s in shrinker(v[i]):
             yield v[:i] + (s,) + v[i+1:]
     return roundrobin(*(shrinki(i) for i in range(len(v))))
 
+@grow.register(tuple)
+def grow_tuple(v):
+    return shrink_tuple(v, shrinker=grow)
+
+class Dict(ArbitrarySpec):
+    """A dict of keyspec keys and valspec values. lengthmin and
+    lengthmax work like they do for List, but generated keys that are
+    equal are only kept once.
+    """
+    def __init__(self, keyspec, valspec, lengthmin=0, lengthmax=None):
+        self.keyspec = keyspec
+        self.valspec = valspec
+        self.pairs = List(Tuple(keyspec, valspec), lengthmin=lengthmin, lengthmax=lengthmax)
+    
+    def arbitrary(self, size=30):
+        return dict(arbitrary(self.pairs, size=size))
+    
+    def series(self, depth):
+        # every dict comes up once for each order of its keys, so only
+        # keep the one with its keys in series order
+        keys = list(series(self.keyspec, depth - 1))
+        for pairs in series(self.pairs, depth):
+            order = [keys.index(k) for k, _ in pairs]
+            if all(a < b for a, b in zip(order, order[1:])):
+                yield dict(pairs)
+    
+    def shrink(self, v):
+        lengthmin = self.pairs.lengthmin
+        for x in shrink_dict(v, shrinker=lambda x: shrink_spec(self.valspec, x)):
+            if len(x) >= lengthmin:
+                yield x
+
+@shrink.register(dict)
+def shrink_dict(v, shrinker=shrink):
+    for k in v:
+        vc = copy.copy(v)
+        del vc[k]
+        yield vc
+    
+    def shrinkk(k):
+        for s in shrinker(v[k]):
+            vc = copy.copy(v)
+            vc[k] = s
+            yield vc
+    
+    for x in roundrobin(*(shrinkk(k) for k in v)):
+        yield x
+
+@shrink.register(set)
+@shrink.register(frozenset)
+def shrink_set(v):
+    for x in v:
+        yield v - {x}
+
 @arbitrary.register(str)
 def arbitrary_str(_):
     return "".join(arbitrary(List(Char())))
 
+@series.register(str)
+def series_str(_, depth):
+    return ("".join(v) for v in series(List(Char()), depth))
+
 @shrink.register(str)
 def shrink_str(v):
     # we need this because type(v[0]) == str
@@ -282,14 +746,325 @@ def shrink_str(v):
         return (chr(x) for x in shrink(ord(v)))
     return shrink_sequence(v, factory=lambda x: x)
 
+def _str_passes(v):
+    if len(v) == 1:
+        return [('shrink', shrink_str(v))]
+    return sequence_passes(v, factory=lambda x: x)
+
+shrink_str.passes = _str_passes
+
+@grow.register(str)
+def grow_str(v):
+    if _fits(len(v) + 1):
+        yield v + arbitrary(Char())
+    if v and _fits(2 * len(v)):
+        yield v + v
+
+def _randbytes(n):
+    if n == 0:
+        return b''
+    r = rng()
+    try:
+        return r.randbytes(n)
+    except AttributeError:
+        # python < 3.9
+        return r.getrandbits(8 * n).to_bytes(n, 'little')
+
+class Bytes(ArbitrarySpec):
+    """Byte strings between minlen and maxlen long, generated in bulk
+    rather than a byte at a time. If given, every byte is drawn from
+    alphabet. type may be bytes, bytearray or memoryview. Memoryviews
+    at least mmap_threshold bytes long are backed by a temporary
+    memory-mapped file rather than by memory.
+    """
+    chunk_size = 1 << 20
+    
+    def __init__(self, minlen=0, maxlen=None, alphabet=None, type=bytes, mmap_threshold=1 << 20):
+        if maxlen is not None and minlen > maxlen:
+            raise ValueError("length minimum is greater than length maximum")
+        if alphabet is not None and len(alphabet) == 0:
+            raise ValueError("alphabet is empty")
+        if type not in (bytes, bytearray, memoryview):
+            raise ValueError("type must be bytes, bytearray or memoryview")
+        self.minlen = minlen
+        self.maxlen = maxlen
+        self.alphabet = alphabet
+        self.type = type
+        self.mmap_threshold = mmap_threshold
+        
+        self.table = None
+        if alphabet is not None:
+            alphabet = bytes(alphabet)
+            self.table = bytes(alphabet[i % len(alphabet)] for i in range(256))
+    
+    def randbytes(self, n):
+        b = _randbytes(n)
+        if self.table is not None:
+            b = b.translate(self.table)
+        return b
+    
+    def arbitrary(self, size=30):
+        n = arbitrary(Integer(min=self.minlen, max=self.maxlen), size=size)
+        if self.type is memoryview and self.mmap_threshold is not None and n >= self.mmap_threshold:
+            return self.mmapped(n)
+        return self.type(self.randbytes(n))
+    
+    def mmapped(self, n):
+        # these are slow to import, and rarely needed
+        import tempfile
+        import mmap
+        with tempfile.TemporaryFile() as f:
+            for start in range(0, n, self.chunk_size):
+                f.write(self.randbytes(min(self.chunk_size, n - start)))
+            f.flush()
+            # the mapping outlives the file object
+            return memoryview(mmap.mmap(f.fileno(), n, access=mmap.ACCESS_READ))
+    
+    def shrink_byte(self, b):
+        if self.alphabet is None:
+            return shrink(b)
+        # earlier bytes in the alphabet are simpler
+        alphabet = bytes(self.alphabet)
+        i = alphabet.find(b)
+        if i < 0:
+            i = len(alphabet)
+        return iter(sorted(set(alphabet[:i]), key=alphabet.index))
+    
+    def shrink(self, v):
+        for name, shrinks in self.shrink_passes(v):
+            for x in shrinks:
+                yield x
+    
+    def shrink_passes(self, v):
+        if self.type is memoryview:
+            passes = [('slice', shrink_memoryview(v))]
+        else:
+            passes = sequence_passes(v, factory=lambda x: self.type([x]), shrinker=self.shrink_byte)
+        if not self.minlen:
+            return passes
+        return [(name, (x for x in shrinks if len(x) >= self.minlen)) for name, shrinks in passes]
+    
+    def grow(self, v):
+        n = len(v)
+        if (self.maxlen is None or n < self.maxlen) and _fits(n + 1):
+            yield self.type(bytes(v) + self.randbytes(1))
+        if n and (self.maxlen is None or 2 * n <= self.maxlen) and _fits(2 * n):
+            yield self.type(bytes(v) * 2)
+    
+    # the simplest, then the edges of signed and unsigned bytes
+    series_values = b'\x00\x01\x7f\x80\xff'
+    
+    def series(self, depth):
+        values = self.series_values
+        if self.alphabet is not None:
+            values = bytes(self.alphabet)
+        values = values[:depth + 1]
+        lengthmax = self.minlen + depth
+        if self.maxlen is not None:
+            lengthmax = min(lengthmax, self.maxlen)
+        for n in range(self.minlen, lengthmax + 1):
+            for t in _product([lambda: values] * n):
+                yield self.type(bytes(t))
+
 @arbitrary.register(bytes)
 def arbitrary_bytes(_):
-    return bytes(arbitrary(List(Integer(min=0x00, max=0xff))))
+    return arbitrary(Bytes())
+
+@series.register(bytes)
+def series_bytes(_, depth):
+    return series(Bytes(), depth)
 
 @shrink.register(bytes)
 def shrink_bytes(v):
     return shrink_sequence(v)
 
+shrink_bytes.passes = sequence_passes
+
+@grow.register(bytes)
+def grow_bytes(v):
+    return Bytes().grow(v)
+
+@arbitrary.register(bytearray)
+def arbitrary_bytearray(_):
+    return arbitrary(Bytes(type=bytearray))
+
+@series.register(bytearray)
+def series_bytearray(_, depth):
+    return series(Bytes(type=bytearray), depth)
+
+@shrink.register(bytearray)
+def shrink_bytearray(v):
+    return shrink_sequence(v)
+
+shrink_bytearray.passes = sequence_passes
+
+@arbitrary.register(memoryview)
+def arbitrary_memoryview(_):
+    return arbitrary(Bytes(type=memoryview))
+
+@series.register(memoryview)
+def series_memoryview(_, depth):
+    return series(Bytes(type=memoryview), depth)
+
+@shrink.register(memoryview)
+def shrink_memoryview(v):
+    # only slices, so big buffers never get copied
+    n = len(v)
+    if n > 1:
+        yield v[:n // 2]
+        yield v[n // 2:]
+    if n > 0:
+        yield v[:-1]
+        yield v[1:]
+
+class Corpus(ArbitrarySpec):
+    """Byte strings taken from the files under path, such as sample
+    inputs for a parser. Files are memory-mapped when they are first
+    used, and at most max_open mappings are kept, so big corpora are
+    never read into memory as a whole. If max_length is given, values
+    are windows of at most that many bytes from a file, rather than
+    whole files.
+    
+    If mutate is True, values get up to three cheap mutations, more at
+    bigger sizes: flipped bits, splices of bytes from another file,
+    and truncation. Mutated values are made from windows of at most
+    mutate_length bytes, so a mutation never copies a whole big file.
+    
+    type may be memoryview or bytes. Unmutated memoryviews are views of
+    the mapping, with nothing copied, but every bytes value is a copy,
+    so use max_length with bytes and big files.
+    """
+    def __init__(self, path, mutate=True, type=memoryview, max_length=None, max_open=16,
+                 mutate_length=4096):
+        if type not in (bytes, memoryview):
+            raise ValueError("type must be bytes or memoryview")
+        self.path = path
+        self.mutate = mutate
+        self.type = type
+        self.max_length = max_length
+        self.max_open = max_open
+        self.mutate_length = mutate_length
+        self._files = None
+        self._maps = None
+        self._lock = threading.Lock()
+    
+    @property
+    def files(self):
+        """(path, length) for each non-empty file, found once."""
+        if self._files is None:
+            import os
+            files = []
+            for root, dirs, names in os.walk(self.path):
+                dirs.sort()
+                for name in sorted(names):
+                    path = os.path.join(root, name)
+                    length = os.path.getsize(path)
+                    if length:
+                        files.append((path, length))
+            if not files:
+                raise ValueError("no files in corpus {!r}".format(self.path))
+            self._files = files
+        return self._files
+    
+    def view(self, i):
+        """A memoryview of the i'th file."""
+        import collections
+        import mmap
+        path, length = self.files[i]
+        with self._lock:
+            if self._maps is None:
+                self._maps = collections.OrderedDict()
+            m = self._maps.get(path)
+            if m is None:
+                with open(path, 'rb') as f:
+                    m = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ)
+                self._maps[path] = m
+                while len(self._maps) > self.max_open:
+                    # views still in use keep their mapping alive
+                    self._maps.popitem(last=False)
+            else:
+                self._maps.move_to_end(path)
+        return memoryview(m)
+    
+    def window(self, r, max_length=None):
+        if max_length is None or (self.max_length is not None and self.max_length < max_length):
+            max_length = self.max_length
+        data = self.view(r.randrange(len(self.files)))
+        if max_length is not None and len(data) > max_length:
+            start = r.randrange(len(data) - max_length + 1)
+            data = data[start:start + max_length]
+        return data
+    
+    def mutated(self, data, n, r):
+        for _ in range(n):
+            kind = r.randrange(3)
+            if kind == 0 and len(data):
+                i = r.randrange(len(data))
+                data = bytearray(data)
+                data[i] ^= 1 << r.randrange(8)
+            elif kind == 1:
+                other = self.window(r, self.mutate_length)
+                start = r.randrange(len(other))
+                piece = other[start:start + r.randrange(1, len(other) - start + 1)]
+                i = r.randrange(len(data) + 1)
+                data = b''.join([data[:i], piece, data[i:]])
+            elif len(data):
+                data = data[:r.randrange(len(data))]
+        return data
+    
+    def arbitrary(self, size=30):
+        r = rng()
+        n = r.randrange(min(size, 3) + 1) if self.mutate else 0
+        if n:
+            data = self.mutated(self.window(r, self.mutate_length), n, r)
+        else:
+            data = self.window(r)
+        if self.type is memoryview:
+            return data if isinstance(data, memoryview) else memoryview(data)
+        return bytes(data)
+    
+    def series(self, depth):
+        for i in range(len(self.files)):
+            data = self.view(i)
+            yield data if self.type is memoryview else bytes(data)
+
+def _is_record(cls, _=None):
+    """Whether cls is a dataclass, a NamedTuple, or a class whose
+    __init__ has annotations, whose values can be made from fields.
+    """
+    if not isinstance(cls, type) or issubclass(cls, ArbitrarySpec):
+        return False
+    if hasattr(cls, '__dataclass_fields__'):
+        return True
+    if issubclass(cls, tuple):
+        return hasattr(cls, '_fields')
+    annotations = getattr(cls.__init__, '__annotations__', None) or {}
+    return any(name != 'return' for name in annotations)
+
+# these come last, so they're checked before anything they might
+# subclass, like tuple for NamedTuples
+
+@arbitrary.register(None, checker=_is_record)
+def arbitrary_record(cls, size=None):
+    from .typehints import resolve
+    return arbitrary(resolve(cls), size=size)
+
+@series.register(None, checker=_is_record)
+def series_record(cls, depth):
+    from .typehints import resolve
+    return series(resolve(cls), depth)
+
+@shrink.register(None, checker=lambda v, _: _is_record(type(v)))
+def shrink_record(v):
+    from .typehints import resolve
+    return resolve(type(v)).shrink(v)
+
+def _record_passes(v):
+    from .typehints import resolve
+    return resolve(type(v)).shrink_passes(v)
+
+shrink_record.passes = _record_passes
+
 # make sure we export all ArbitrarySpec subclasses
 for name, val in list(locals().items()):
     if type(val) == type and issubclass(val, ArbitrarySpec):
@@ -4,8 +4,10 @@ from .generic import generic
 
 import threading
 import contextlib
+import random
 
-__all__ = ['arbitrary', 'shrink', 'sized']
+__all__ = ['ArbitrarySpec', 'arbitrary', 'shrink', 'shrink_spec', 'shrink_passes', 'sized', 'split_size',
+           'rng', 'seeded', 'series', 'grow', 'grow_spec']
 
 thread_locals = threading.local()
 
@@ -37,7 +39,34 @@ def sized(size=None):
     single argument, this simply retrieves the default value."""
     return thread_local('_quickcheck_arbitrary_size', size)
 
-@generic(issubclass)
+def seeded(r=None):
+    """A context manager that makes arbitrary() draw its randomness
+    from r, a random.Random, for all code in this thread within its
+    block. If r is an int, it is used to seed a new random.Random.
+    Yields the random.Random in use. If given no arguments, or None,
+    this simply retrieves it, or None if none was set.
+    """
+    if isinstance(r, int):
+        r = random.Random(r)
+    return thread_local('_quickcheck_random', r)
+
+def rng():
+    """The source of randomness that implementations of arbitrary()
+    should use: the random.Random set with seeded(), or the random
+    module itself if there isn't one.
+    """
+    return getattr(thread_locals, '_quickcheck_random', random)
+
+def split_size(size, parts):
+    """Divide a size budget between parts children of a composite
+    value, so that the whole value stays within the budget. A size of
+    None means no budget, and stays None.
+    """
+    if size is None or parts <= 1:
+        return size
+    return size // parts
+
+@generic(issubclass, defaults='quickcheck.implementations')
 def arbitrary(impl, typ, size=None):
     """Return an arbitrary, random value of the given type. Must be
     implemented for every type you want to use with pyquickcheck. If
@@ -55,9 +84,12 @@ def arbitrary(impl, typ, size=None):
         return impl(typ)
     
     with sized(size) as effective_size:
+        profile = getattr(thread_locals, '_quickcheck_profile', None)
+        if profile is not None:
+            return profile.measure(typ, lambda: impl_with_size(effective_size))
         return impl_with_size(effective_size)
 
-@generic(isinstance)
+@generic(isinstance, defaults='quickcheck.implementations')
 def shrink(impl, v):
     """Given a value, produce an iterable of simpler values based on
     that value. For example, shrinking a list should yield sublists,
@@ -68,3 +100,92 @@ def shrink(impl, v):
     if impl:
         return impl(v)
     return []
+
+@generic(isinstance, defaults='quickcheck.implementations')
+def grow(impl, v):
+    """The opposite of shrink(): produce an iterable of bigger or more
+    extreme values based on v, like longer lists and larger numbers,
+    for searching for inputs that a property finds hard. The default
+    implementation produces an empty list.
+    """
+    if impl:
+        return impl(v)
+    return []
+
+@generic(issubclass, defaults='quickcheck.implementations')
+def series(impl, typ, depth):
+    """Return an iterable of every value of the given type up to depth,
+    simplest first, for checking properties exhaustively on small
+    values. Each call starts a new iteration, and values are made as
+    they are needed, so the series can be long without being kept in
+    memory.
+    """
+    if not impl:
+        raise NotImplementedError("series({})".format(typ))
+    return impl(typ, depth)
+
+class ArbitrarySpec:
+    """Can be used in place of a type name in arbitrary(), for when
+    you need more control over generated values.
+    """
+    def arbitrary(self, size=None):
+        raise NotImplementedError("{}.arbitrary".format(self.__class__.__name__))
+    
+    def series(self, depth):
+        """Every value this spec makes, up to depth, as described in
+        series(). Specs made of other specs usually give them one less
+        depth.
+        """
+        raise NotImplementedError("{}.series".format(self.__class__.__name__))
+    
+    def shrink(self, v):
+        """Produce simpler versions of v, a value made by this spec. By
+        default, this is just shrink(v).
+        """
+        return shrink(v)
+    
+    def shrink_passes(self, v):
+        """Split the shrinks of v into passes, as described in
+        shrink_passes(). Specs that override shrink() should override
+        this too, if their shrinks come in distinct kinds.
+        """
+        if type(self).shrink is ArbitrarySpec.shrink:
+            return shrink_passes(None, v)
+        return [('shrink', self.shrink(v))]
+    
+    def grow(self, v):
+        """Produce bigger versions of v, as described in grow(), that
+        this spec could have made. By default, there are none, as
+        bigger values are not always allowed.
+        """
+        return []
+
+def shrink_spec(spec, v):
+    """Shrink v, a value generated from spec, using the spec's own
+    shrinker if it has one.
+    """
+    if isinstance(spec, ArbitrarySpec):
+        return spec.shrink(v)
+    return shrink(v)
+
+def shrink_passes(spec, v):
+    """Like shrink_spec(), but split up into passes, as a list of
+    (name, iterable) pairs, such as dropping elements of a list and
+    simplifying them. This lets a minimizer learn which passes are
+    worth trying first. Implementations of shrink() can offer passes
+    with a passes attribute, a function taking the value.
+    """
+    if isinstance(spec, ArbitrarySpec):
+        return spec.shrink_passes(v)
+    passes = getattr(shrink.find(v), 'passes', None)
+    if passes is not None:
+        return passes(v)
+    return [('shrink', shrink(v))]
+
+def grow_spec(spec, v):
+    """Grow v, a value generated from spec, using the spec's own grow()
+    if it is an ArbitrarySpec.
+    """
+    if isinstance(spec, ArbitrarySpec):
+        return spec.grow(v)
+    return grow(v)
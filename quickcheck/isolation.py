@@ -0,0 +1,234 @@
+"""Run properties inside a pool of pre-forked worker processes, so
+that crashes, hangs and leaks in the code under test cannot take the
+whole checker down with them.
+"""
+
+from . import statistics
+from .checker import failure_location
+
+import os
+import pickle
+import sys
+import signal
+import traceback
+import collections
+import multiprocessing
+
+__all__ = ['Isolation', 'TrialTimeout', 'TrialCrashed']
+
+class TrialTimeout(Exception):
+    """Raised when an isolated trial runs longer than its timeout."""
+    pass
+
+class TrialCrashed(Exception):
+    """Raised when the worker running an isolated trial dies."""
+    pass
+
+class RemoteError(Exception):
+    """Stands in for an exception raised in a worker that could not be
+    sent back to the parent process.
+    """
+    pass
+
+class _RemoteTraceback(Exception):
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+def _rss():
+    """Resident set size of the current process, in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        # kilobytes everywhere but OS X
+        rss *= 1024
+    return rss
+
+def _worker_main(conn, target, measure_rss):
+    while True:
+        try:
+            kwargs = conn.recv()
+        except EOFError:
+            break
+        if kwargs is None:
+            break
+
+        with statistics.recording() as trial:
+            try:
+                result = ('return', target(**kwargs))
+            except Exception as e:
+                # the traceback doesn't survive the trip to the parent
+                e._quickcheck_location = failure_location(e.__traceback__)
+                result = ('raise', e, traceback.format_exc())
+
+        rss = _rss() if measure_rss else None
+        try:
+            if result[0] == 'raise':
+                # some pickle but don't unpickle, like exceptions whose
+                # __init__ takes other arguments than they pass on
+                pickle.loads(pickle.dumps(result[1]))
+            conn.send(result + (trial, rss))
+        except Exception:
+            # the return value or exception didn't pickle
+            if result[0] == 'return':
+                tb = traceback.format_exc()
+                e = RemoteError("could not send return value: {!r}".format(result[1]))
+            else:
+                tb = result[2]
+                e = RemoteError("{}: {}".format(type(result[1]).__name__, result[1]))
+                e._quickcheck_location = result[1]._quickcheck_location
+            conn.send(('raise', e, tb, trial, rss))
+
+class _Worker:
+    def __init__(self, target, measure_rss):
+        # don't let buffered output get written twice
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        conn, child_conn = multiprocessing.Pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                conn.close()
+                _worker_main(child_conn, target, measure_rss)
+                status = 0
+            finally:
+                os._exit(status)
+
+        child_conn.close()
+        self.pid = pid
+        self.conn = conn
+        self.trials = 0
+
+    def reap(self):
+        """Wait for the worker to exit, and describe how it did."""
+        self.conn.close()
+        _, status = os.waitpid(self.pid, 0)
+        if os.WIFSIGNALED(status):
+            sig = os.WTERMSIG(status)
+            try:
+                name = signal.Signals(sig).name
+            except ValueError:
+                name = str(sig)
+            return "worker killed by signal {} ({})".format(sig, name)
+        return "worker exited with status {}".format(os.WEXITSTATUS(status))
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.reap()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.reap()
+
+class WorkerPool:
+    """A set of forked workers that all run the same target. Call the
+    pool with keyword arguments to run the target on them in one of
+    the workers. Use it as a context manager, so the workers are
+    cleaned up afterwards.
+    """
+    def __init__(self, target, isolation):
+        self.target = target
+        self.isolation = isolation
+        self.workers = collections.deque()
+
+    def spawn(self):
+        measure_rss = self.isolation.max_rss is not None
+        self.workers.append(_Worker(self.target, measure_rss))
+
+    def __enter__(self):
+        for _ in range(self.isolation.workers):
+            self.spawn()
+        return self
+
+    def __exit__(self, *exc_info):
+        while self.workers:
+            self.workers.popleft().close()
+
+    def __call__(self, **kwargs):
+        worker = self.workers.popleft()
+        try:
+            worker.conn.send(kwargs)
+        except Exception:
+            # like arguments that don't pickle; the worker may have
+            # been sent part of them, so start a fresh one
+            worker.kill()
+            self.spawn()
+            raise
+
+        if not worker.conn.poll(self.isolation.timeout):
+            worker.kill()
+            self.spawn()
+            raise TrialTimeout("trial took longer than {} seconds".format(self.isolation.timeout))
+
+        try:
+            result = worker.conn.recv()
+        except EOFError:
+            status = worker.reap()
+            self.spawn()
+            raise TrialCrashed(status)
+        except Exception:
+            # it pickled in the worker but doesn't unpickle here, like
+            # an exception whose __init__ takes other arguments
+            tb = traceback.format_exc()
+            worker.kill()
+            self.spawn()
+            e = RemoteError("could not receive the trial's result")
+            e.__cause__ = _RemoteTraceback(tb)
+            raise e
+
+        worker.trials += 1
+        trial, rss = result[-2:]
+        statistics.merge(trial)
+        max_trials = self.isolation.max_trials
+        if (max_trials is not None and worker.trials >= max_trials) or \
+           (rss is not None and rss > self.isolation.max_rss):
+            # recycle this worker
+            worker.close()
+            self.spawn()
+        else:
+            self.workers.append(worker)
+
+        if result[0] == 'raise':
+            e = result[1]
+            e.__cause__ = _RemoteTraceback(result[2])
+            raise e
+        return result[1]
+
+class Isolation:
+    """Options for running trials in separate processes, for use as the
+    isolate argument to quickcheck().
+
+    timeout is the wall-clock limit for a single trial, in seconds,
+    and trials that exceed it fail with TrialTimeout. Trials whose
+    worker dies fail with TrialCrashed. workers is the number of
+    pre-forked processes kept warm. A worker is replaced once it has
+    run max_trials trials, or once its resident set size exceeds
+    max_rss bytes.
+    """
+    def __init__(self, timeout=None, workers=1, max_trials=None, max_rss=None):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("isolation requires os.fork()")
+        if workers < 1:
+            raise ValueError("need at least one worker")
+        self.timeout = timeout
+        self.workers = workers
+        self.max_trials = max_trials
+        self.max_rss = max_rss
+
+    def pool(self, target):
+        return WorkerPool(target, self)
@@ -0,0 +1,136 @@
+"""Measure the memory each trial of a property uses, with tracemalloc,
+to find heavy inputs and leaks.
+"""
+
+import gc
+import heapq
+import itertools
+import tracemalloc
+
+__all__ = ['MemoryLimitExceeded', 'MemoryReport']
+
+class MemoryLimitExceeded(Exception):
+    """Raised when a trial uses more memory than quickcheck() allows,
+    so that it is shrunk like any other failure.
+    """
+    pass
+
+def _size(n):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(n) < 1024:
+            return "{:.0f} {}".format(n, unit)
+        n /= 1024
+    return "{:.1f} GiB".format(n)
+
+class MemoryReport:
+    """Memory used by the trials of a quickcheck run. peak is the most
+    any trial allocated at once, and heaviest holds (peak, arguments)
+    for the trials that allocated the most, as reprs, biggest
+    first. slope is the trend in memory still allocated after each
+    trial, in bytes per trial, which grows steadily if the code under
+    test leaks.
+    """
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.trials = 0
+        self.peak = 0
+        self._heaviest = []
+        self._counter = itertools.count()
+        # running sums for a least squares fit of retained memory
+        self._sums = [0, 0, 0, 0]
+
+    def add(self, used, peak, retained):
+        self.trials += 1
+        self.peak = max(self.peak, peak)
+        entry = (peak, next(self._counter), used)
+        if len(self._heaviest) < self.keep:
+            heapq.heappush(self._heaviest, entry)
+        elif peak > self._heaviest[0][0]:
+            heapq.heapreplace(self._heaviest, entry)
+        x = self.trials
+        sums = self._sums
+        sums[0] += x
+        sums[1] += retained
+        sums[2] += x * retained
+        sums[3] += x * x
+
+    @property
+    def heaviest(self):
+        return [(peak, used) for peak, _, used in sorted(self._heaviest, reverse=True)]
+
+    @property
+    def slope(self):
+        n = self.trials
+        sx, sy, sxy, sxx = self._sums
+        denominator = n * sxx - sx * sx
+        if n < 2 or denominator == 0:
+            return 0.0
+        return (n * sxy - sx * sy) / denominator
+
+    def leaking(self, threshold=1024, min_trials=20):
+        """Whether memory grew by more than threshold bytes per trial,
+        over at least min_trials trials.
+        """
+        return self.trials >= min_trials and self.slope > threshold
+
+    def __str__(self):
+        lines = ["peak {} per trial, retained memory trend {}/trial".format(
+            _size(self.peak), _size(self.slope))]
+        if self.leaking():
+            lines.append("memory grows steadily across trials; possible leak")
+        for peak, used in self.heaviest:
+            lines.append("{:>10} {}".format(_size(peak), used))
+        return "\n".join(lines)
+
+class MemoryTracker:
+    """Wraps a property to measure each call, and fails calls that
+    use more than max_trial_memory bytes at once, or that leave more
+    than max_memory_growth bytes more allocated than they started
+    with. Use it as a context manager, to start and stop tracemalloc.
+    """
+    def __init__(self, max_trial_memory=None, max_memory_growth=None):
+        self.max_trial_memory = max_trial_memory
+        self.max_memory_growth = max_memory_growth
+        self.report = MemoryReport()
+        self.last = None
+        self.started = False
+        self.baseline = 0
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+        gc.collect()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.started:
+            tracemalloc.stop()
+
+    def wrap(self, fn):
+        def measured(**kwargs):
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            ret = fn(**kwargs)
+            peak = tracemalloc.get_traced_memory()[1] - before
+            gc.collect()
+            after = tracemalloc.get_traced_memory()[0]
+            self.last = (peak, after)
+            if self.max_trial_memory is not None and peak > self.max_trial_memory:
+                raise MemoryLimitExceeded("trial allocated {}, more than max_trial_memory".format(
+                    _size(peak)))
+            if self.max_memory_growth is not None and after - before > self.max_memory_growth:
+                raise MemoryLimitExceeded("trial kept {} allocated, more than max_memory_growth".format(
+                    _size(after - before)))
+            return ret
+        return measured
+
+    def record(self, used):
+        """Add the last call to the report, made with arguments used."""
+        peak, after = self.last
+        text = repr(used)
+        if len(text) > 200:
+            text = text[:197] + '...'
+        self.report.add(text, peak, after - self.baseline)
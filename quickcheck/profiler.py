@@ -0,0 +1,121 @@
+"""Measure where the time spent generating arguments goes, spec by
+spec, to find the slow part of a large composite spec.
+"""
+
+from .interface import thread_local
+
+import json
+import time
+
+__all__ = ['GenerationProfile', 'profiling']
+
+def _node_name(typ):
+    if isinstance(typ, type):
+        return typ.__qualname__
+    return type(typ).__qualname__
+
+def _items(value):
+    try:
+        return len(value)
+    except TypeError:
+        return 1
+
+class ProfileNode:
+    """Totals for one spec, reached through one path of parent specs.
+    time includes the time spent in children, and self_time doesn't.
+    items counts the values generated, or their lengths, for values
+    that have one.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.time = 0.0
+        self.items = 0
+        self.children = {}
+
+    @property
+    def self_time(self):
+        return max(self.time - sum(c.time for c in self.children.values()), 0.0)
+
+    def child(self, name):
+        try:
+            return self.children[name]
+        except KeyError:
+            node = self.children[name] = ProfileNode(name)
+            return node
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'time': self.time,
+            'self_time': self.self_time,
+            'items': self.items,
+            'children': [c.to_dict() for c in self.by_time()],
+        }
+
+    def by_time(self):
+        return sorted(self.children.values(), key=lambda c: c.time, reverse=True)
+
+class GenerationProfile:
+    """The calls to arbitrary() made inside profiling(), as a tree of
+    ProfileNodes under root, one for each path of nested specs, like
+    List -> Tuple -> Char.
+    """
+    def __init__(self):
+        self.root = ProfileNode('arbitrary')
+        self.stack = [self.root]
+
+    def measure(self, typ, generate):
+        """Call generate(), to make a value for typ, and add it to the
+        tree under the spec generating at the moment.
+        """
+        node = self.stack[-1].child(_node_name(typ))
+        self.stack.append(node)
+        start = time.perf_counter()
+        try:
+            value = generate()
+        finally:
+            node.time += time.perf_counter() - start
+            node.calls += 1
+            self.stack.pop()
+        node.items += _items(value)
+        return value
+
+    def to_json(self, **kwargs):
+        """The tree as JSON. Times are in seconds."""
+        return json.dumps(self.root.to_dict(), **kwargs)
+
+    def collapsed(self):
+        """The tree as collapsed stacks, one line for each node, with
+        its self time in microseconds, for flame graph tools.
+        """
+        lines = []
+        def walk(node, path):
+            path = path + [node.name]
+            lines.append("{} {}".format(';'.join(path), int(round(node.self_time * 1e6))))
+            for c in node.by_time():
+                walk(c, path)
+        for c in self.root.by_time():
+            walk(c, [])
+        return "\n".join(lines)
+
+    def __str__(self):
+        lines = ["{:>10} {:>8} {:>10} {:>10}  spec".format('time', 'calls', 'self', 'items')]
+        def walk(node, depth):
+            lines.append("{:>9.3f}s {:>8} {:>9.3f}s {:>10}  {}{}".format(
+                node.time, node.calls, node.self_time, node.items, '  ' * depth, node.name))
+            for c in node.by_time():
+                walk(c, depth + 1)
+        for c in self.root.by_time():
+            walk(c, 0)
+        return "\n".join(lines)
+
+def profiling(profile=None):
+    """A context manager that records every call to arbitrary() in
+    this thread within its block, in profile or a new
+    GenerationProfile, and yields it.
+    """
+    if profile is None:
+        profile = GenerationProfile()
+    return thread_local('_quickcheck_profile', profile)
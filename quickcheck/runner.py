@@ -0,0 +1,315 @@
+"""Find the properties decorated with quickcheck() in modules and files,
+and check them all, on a pool of processes.
+"""
+
+from .checker import quickcheck, QuickCheckError, CoverageError
+
+import fnmatch
+import importlib
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import traceback
+import zlib
+
+__all__ = ['discover', 'run_property', 'run', 'main']
+
+# files that a directory is searched for, like pytest
+_test_files = ['test*.py', '*_test.py']
+
+def _load(target):
+    kind, where = target
+    if kind == 'module':
+        return importlib.import_module(where)
+    name = os.path.splitext(os.path.basename(where))[0]
+    module = sys.modules.get(name)
+    if module is not None and os.path.abspath(getattr(module, '__file__', '') or '') == where:
+        return module
+    # so that it can import the modules next to it
+    directory = os.path.dirname(where)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, where)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _targets(name):
+    if not os.path.exists(name):
+        yield ('module', name)
+    elif os.path.isdir(name):
+        for root, dirs, files in os.walk(name):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for f in sorted(files):
+                if any(fnmatch.fnmatch(f, pattern) for pattern in _test_files):
+                    yield ('path', os.path.abspath(os.path.join(root, f)))
+    else:
+        yield ('path', os.path.abspath(name))
+
+def discover(names, errors=None):
+    """Find properties in names, which are module names, Python files,
+    or directories to search for test files. Returns a list of
+    (target, name) pairs, for run_property(). Only properties at the
+    top level of a module are found. If errors is a list, modules that
+    fail to import are added to it as results with an error status,
+    like run_property() returns, instead of raising.
+    """
+    found = []
+    for name in names:
+        for target in _targets(name):
+            try:
+                module = _load(target)
+            except Exception as e:
+                if errors is None:
+                    raise
+                result = _result(_module_name(target), None)
+                result['status'] = 'error'
+                result['message'] = _describe_error(e)
+                errors.append(result)
+                continue
+            for attr, value in vars(module).items():
+                if getattr(value, 'quickcheck_settings', None) is not None and \
+                   getattr(value, '__module__', None) == module.__name__:
+                    found.append((target, attr))
+    return found
+
+def _module_name(target):
+    kind, where = target
+    if kind == 'path':
+        where = os.path.splitext(os.path.basename(where))[0]
+    return where
+
+def _full_name(target, name):
+    return "{}.{}".format(_module_name(target), name)
+
+def _describe_error(e):
+    return "".join(traceback.format_exception_only(type(e), e)).strip()
+
+def _result(name, seed):
+    return {
+        'name': name,
+        'status': 'passed',
+        'seed': seed,
+        'trials': 0,
+        'discards': 0,
+        'shrink_steps': 0,
+        'shrink_calls': 0,
+        'shrink_seconds': 0.0,
+        'out_of_time': False,
+        'cached': False,
+        'message': None,
+        'replay': None,
+        'seconds': 0.0,
+        'trials_per_second': 0.0,
+    }
+
+def run_property(target, name, overrides={}):
+    """Check one property found by discover(), with some settings of
+    quickcheck() replaced by overrides, and return a dict describing
+    the outcome, fit for JSON.
+    """
+    prop = getattr(_load(target), name)
+    settings = dict(prop.quickcheck_settings)
+    settings.update(overrides)
+
+    reports = []
+    shrinks = []
+    user_report = settings['report']
+    user_progress = settings['shrink_progress']
+    def report(r):
+        reports.append(r)
+        if user_report:
+            user_report(r)
+    def progress(state):
+        shrinks.append(state.elapsed)
+        if user_progress:
+            user_progress(state)
+    settings['report'] = report
+    settings['shrink_progress'] = progress
+
+    result = _result(_full_name(target, name), settings['seed'])
+    started = time.monotonic()
+    try:
+        quickcheck(**settings)(prop.__wrapped__)()
+    except QuickCheckError as e:
+        result['status'] = 'failed'
+        result['message'] = str(e)
+        result['replay'] = e.replay
+        if e.report is not None:
+            reports.append(e.report)
+        if e.shrink is not None:
+            result['shrink_steps'] = e.shrink.steps
+            result['shrink_calls'] = e.shrink.calls
+            result['shrink_seconds'] = shrinks[-1] if shrinks else e.shrink.elapsed
+    except CoverageError as e:
+        result['status'] = 'failed'
+        result['message'] = str(e)
+        reports.append(e.report)
+    except Exception as e:
+        result['status'] = 'error'
+        result['message'] = _describe_error(e)
+    result['seconds'] = time.monotonic() - started
+    if reports:
+        r = reports[-1]
+        result['trials'] = r.successes + r.discards + r.searched
+        result['discards'] = r.discards
+        result['out_of_time'] = r.out_of_time
+        result['cached'] = r.cached
+    result['trials_per_second'] = result['trials'] / max(result['seconds'], 1e-9)
+    return result
+
+def _overrides(target, name, seed, replay, time_budget):
+    settings = getattr(_load(target), name).quickcheck_settings
+    overrides = {}
+    if time_budget is not None:
+        overrides['time_budget'] = time_budget
+    if replay is not None:
+        overrides['replay'] = replay
+    elif seed is not None:
+        overrides['seed'] = seed
+    elif settings['seed'] is None and settings['cache']:
+        # the seed is part of the cache key, so use the same one every
+        # run, or the cache would never hit
+        overrides['seed'] = zlib.crc32(_full_name(target, name).encode('utf-8'))
+    elif settings['seed'] is None:
+        # pick one, so that a failure can be checked again with --seed
+        overrides['seed'] = random.getrandbits(32)
+    return overrides
+
+def run(properties, jobs=None, seed=None, replay=None, time_budget=None):
+    """Check properties from discover(), on jobs processes, or in this
+    one if jobs is 1, and yield the result of each as it finishes.
+    """
+    work = [(target, name, _overrides(target, name, seed, replay, time_budget))
+            for target, name in properties]
+    if jobs == 1 or len(work) <= 1:
+        for args in work:
+            yield run_property(*args)
+        return
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        futures = [executor.submit(run_property, *args) for args in work]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+def summarize(results, slowest=5):
+    """Totals over the results of run(), as a dict fit for JSON."""
+    seconds = sum(r['seconds'] for r in results)
+    trials = sum(r['trials'] for r in results)
+    failed = [r for r in results if r['status'] == 'failed']
+    return {
+        'properties': len(results),
+        'passed': sum(r['status'] == 'passed' for r in results),
+        'failed': len(failed),
+        'errors': sum(r['status'] == 'error' for r in results),
+        'trials': trials,
+        'seconds': seconds,
+        'trials_per_second': trials / max(seconds, 1e-9),
+        'slowest': [r['name'] for r in sorted(results, key=lambda r: r['seconds'], reverse=True)[:slowest]],
+        'shrink_calls': sum(r['shrink_calls'] for r in failed),
+        'shrink_seconds': sum(r['shrink_seconds'] for r in failed),
+    }
+
+def _format(result):
+    line = "{:<6} {}: {} trials in {:.2f}s ({:.0f}/s)".format(
+        result['status'].upper(), result['name'], result['trials'],
+        result['seconds'], result['trials_per_second'])
+    if result['cached']:
+        line += ", cached"
+    if result['out_of_time']:
+        line += ", time budget used up"
+    lines = [line]
+    if result['message'] is not None:
+        lines.append("    " + result['message'])
+        if result['replay'] is not None:
+            lines.append("    reproduce with --replay {}".format(result['replay']))
+        elif result['seed'] is not None:
+            lines.append("    reproduce with --seed {}".format(result['seed']))
+    return "\n".join(lines)
+
+def _format_summary(summary, results):
+    by_name = {r['name']: r for r in results}
+    lines = ["{properties} properties: {passed} passed, {failed} failed, {errors} errors; "
+             "{trials} trials in {seconds:.2f}s ({trials_per_second:.0f} trials/s)".format(**summary)]
+    if summary['slowest']:
+        lines.append("slowest: " + ", ".join(
+            "{} {:.2f}s".format(name, by_name[name]['seconds']) for name in summary['slowest']))
+    if summary['failed']:
+        lines.append("shrinking: {shrink_calls} calls in {shrink_seconds:.2f}s".format(**summary))
+    return "\n".join(lines)
+
+def _version():
+    try:
+        from importlib.metadata import version
+    except ImportError:
+        # python < 3.8
+        import pkg_resources
+        return pkg_resources.require("pyquickcheck")[0].version
+    return version("pyquickcheck")
+
+def _interact():
+    import code
+    import quickcheck
+    namespace = {name: getattr(quickcheck, name) for name in quickcheck.__all__}
+    code.interact(banner="pyquickcheck {}".format(_version()), local=namespace)
+
+def main(argv=None):
+    """The command line interface, as python -m quickcheck. Returns the
+    exit status: 0 if every property passed, and 1 if not, or if no
+    properties were found.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m quickcheck',
+        description="Check the properties decorated with quickcheck() in modules, files, "
+                    "and directories, which are searched for {} files.".format(
+                        " and ".join(_test_files)))
+    parser.add_argument('names', nargs='*', metavar='MODULE_OR_PATH')
+    parser.add_argument('-k', dest='pattern', help="only check properties whose name contains this")
+    parser.add_argument('-j', '--jobs', type=int, help="processes to check on (default: one per CPU)")
+    parser.add_argument('--seed', type=int, help="seed every property's random arguments with this")
+    parser.add_argument('--replay', help="check the one selected property on this failing trial")
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help="stop starting trials of each property after this long")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    parser.add_argument('-i', '--interactive', action='store_true',
+                        help="open an interactive shell with quickcheck imported")
+    args = parser.parse_args(argv)
+
+    if args.interactive:
+        _interact()
+        return 0
+    if not args.names:
+        parser.error("no modules or paths given")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("need at least one job")
+
+    if '' not in sys.path:
+        # like python -m, so modules in the current directory are found
+        sys.path.insert(0, '')
+    results = []
+    properties = discover(args.names, results)
+    if args.pattern is not None:
+        properties = [(target, name) for target, name in properties
+                      if args.pattern in _full_name(target, name)]
+    if args.replay is not None and len(properties) != 1:
+        parser.error("--replay needs exactly one property, selected with -k; found {}".format(
+            len(properties)))
+
+    if not args.json:
+        for result in results:
+            print(_format(result), flush=True)
+    for result in run(properties, args.jobs, args.seed, args.replay, args.time_budget):
+        results.append(result)
+        if not args.json:
+            print(_format(result), flush=True)
+    summary = summarize(results)
+    if args.json:
+        print(json.dumps({'properties': results, 'summary': summary}, indent=1))
+    else:
+        print(_format_summary(summary, results))
+    return 0 if summary['properties'] and summary['passed'] == summary['properties'] else 1
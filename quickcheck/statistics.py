@@ -0,0 +1,120 @@
+"""Label the trials a property is checked with, to see how they were
+spent, and require that some labels come up often enough.
+"""
+
+from .interface import thread_local, thread_locals
+
+import collections
+
+__all__ = ['label', 'classify', 'collect', 'cover', 'target', 'Statistics']
+
+class TrialLabels:
+    """The labels, coverage requirements and target scores from a
+    single trial.
+    """
+    def __init__(self):
+        self.labels = []
+        self.coverage = {}
+        self.targets = {}
+
+    def update(self, other):
+        for name in other.labels:
+            if name not in self.labels:
+                self.labels.append(name)
+        for name, pct in other.coverage.items():
+            self.coverage[name] = max(pct, self.coverage.get(name, 0))
+        for name, score in other.targets.items():
+            self.targets[name] = max(score, self.targets.get(name, score))
+
+def recording():
+    """A context manager that collects labels for one trial, and
+    yields the TrialLabels they end up in.
+    """
+    return thread_local('_quickcheck_trial', TrialLabels())
+
+def _current():
+    return getattr(thread_locals, '_quickcheck_trial', None)
+
+def merge(trial):
+    """Add the labels from a TrialLabels recorded elsewhere, like in
+    another process, to the current trial.
+    """
+    current = _current()
+    if current is not None:
+        current.update(trial)
+
+def label(name):
+    """Attach a label to the current trial. Outside of a quickcheck
+    trial, this does nothing.
+    """
+    trial = _current()
+    if trial is not None and name not in trial.labels:
+        trial.labels.append(name)
+
+def classify(condition, name):
+    """Label the current trial with name, if condition is true."""
+    if condition:
+        label(name)
+
+def collect(value):
+    """Label the current trial with the repr of value."""
+    label(repr(value))
+
+def cover(pct, name, condition=True):
+    """Require that at least pct percent of trials are labelled with
+    name, and label this one if condition is true. If the requirement
+    is not met after the usual number of tries, quickcheck keeps
+    trying for a while before failing.
+    """
+    trial = _current()
+    if trial is not None:
+        trial.coverage[name] = max(pct, trial.coverage.get(name, 0))
+    classify(condition, name)
+
+def target(score, name=''):
+    """Report a score for the current trial, like its running time or
+    the size of its output. quickcheck keeps the arguments that scored
+    highest, and with maximize, searches for arguments that score even
+    higher. If a trial reports more than one score under a name, the
+    highest counts.
+    """
+    trial = _current()
+    if trial is not None:
+        trial.targets[name] = max(score, trial.targets.get(name, score))
+
+class Statistics:
+    """Label counts over all the successful trials of a property."""
+    def __init__(self):
+        self.trials = 0
+        self.labels = collections.Counter()
+        self.coverage = {}
+
+    def add(self, trial):
+        self.trials += 1
+        self.labels.update(trial.labels)
+        for name, pct in trial.coverage.items():
+            self.coverage[name] = max(pct, self.coverage.get(name, 0))
+
+    def percent(self, name):
+        if not self.trials:
+            return 0.0
+        return 100.0 * self.labels[name] / self.trials
+
+    def insufficient(self):
+        """A list of (name, required, actual) for each coverage
+        requirement that isn't met.
+        """
+        missing = []
+        for name, pct in sorted(self.coverage.items()):
+            actual = self.percent(name)
+            if actual < pct:
+                missing.append((name, pct, actual))
+        return missing
+
+    def __str__(self):
+        lines = []
+        for name, count in self.labels.most_common():
+            lines.append("{:6.2f}% {}".format(self.percent(name), name))
+        for name, pct, actual in self.insufficient():
+            lines.append("only {:.2f}% {}, but expected {:.2f}%".format(actual, name, pct))
+        return "\n".join(lines)
@@ -0,0 +1,89 @@
+"""Search for arguments that make a property report higher scores with
+target(), by hill climbing from the highest scoring arguments so far.
+"""
+
+from .interface import grow_spec, shrink_spec, seeded, sized
+
+import heapq
+import itertools
+
+__all__ = ['TargetSearch']
+
+class TargetSearch:
+    """Proposes arguments for steps more trials, each made from the
+    highest scoring arguments for the target name by growing, or
+    sometimes shrinking, one of them. After patience proposals in a
+    row don't score higher, it starts again from one of the keep
+    highest scoring arguments, so that it doesn't get stuck. Arguments
+    grow up to size, the largest trial size.
+    """
+    def __init__(self, specs, name, steps, size, patience=10, keep=5, candidates=16):
+        self.specs = specs
+        self.name = name
+        self.steps = steps
+        self.size = size
+        self.patience = patience
+        self.keep = keep
+        self.candidates = candidates
+        self.proposed = 0
+        self.stale = 0
+        self.random = None
+        # (score, counter, arguments)
+        self.current = None
+        self.best = []
+        self.counter = itertools.count()
+
+    def observe(self, used, trial):
+        """Take the outcome of a trial, with trial None if it was
+        discarded.
+        """
+        score = None if trial is None else trial.targets.get(self.name)
+        if score is None:
+            if self.proposed:
+                self.stale += 1
+            return
+        entry = (score, next(self.counter), used)
+        if len(self.best) < self.keep:
+            heapq.heappush(self.best, entry)
+        elif score > self.best[0][0]:
+            heapq.heapreplace(self.best, entry)
+        if self.current is None or score > self.current[0]:
+            self.current = entry
+            self.stale = 0
+        elif self.proposed:
+            if score == self.current[0]:
+                # move along plateaus, in case they lead somewhere
+                self.current = entry
+            self.stale += 1
+            if self.stale >= self.patience and self.random is not None:
+                self.current = self.random.choice(self.best)
+                self.stale = 0
+
+    def more(self):
+        return self.proposed < self.steps
+
+    def propose(self, r):
+        """Return (size, arguments) for the next trial, made with the
+        random.Random r, or None if no trial has reported a score yet.
+        """
+        if self.current is None:
+            return None
+        self.random = r
+        self.proposed += 1
+        _, _, used = self.current
+        names = list(self.specs)
+        with seeded(r), sized(self.size):
+            for name in r.sample(names, len(names)):
+                directions = [grow_spec, shrink_spec]
+                if r.random() < 0.25:
+                    directions.reverse()
+                for direction in directions:
+                    options = list(itertools.islice(direction(self.specs[name], used[name]),
+                                                    self.candidates))
+                    if options:
+                        values = dict(used)
+                        # earlier ones tend to be the bigger steps, like
+                        # halves come before single deletions in shrinks
+                        values[name] = options[int(len(options) * r.random() ** 2)]
+                        return self.size, values
+        return None
@@ -1,5 +1,13 @@
 import quickcheck as qc
 import unittest
+import time
+import functools
+import os
+import sys
+import mmap
+import subprocess
+import typing
+import dataclasses
 
 class LeafSpec(qc.ArbitrarySpec):
     def __init__(self, simple_only=False):
@@ -13,6 +21,10 @@ class LeafSpec(qc.ArbitrarySpec):
             specs.append(qc.Char())
         return qc.arbitrary(qc.Choice(*specs))        
 
+class SizeSpec(qc.ArbitrarySpec):
+    def arbitrary(self, size=None):
+        return size
+
 @qc.arbitrary.register(qc.Float)
 def arbitrary_float_spec(_):
     min = None
@@ -115,3 +127,1400 @@ class TestSpecs(unittest.TestCase):
         if spec.min is not None:
             self.assertGreaterEqual(v, spec.min)
         return True
+
+class TestWeights(unittest.TestCase):
+    def test_alias_table(self):
+        import random
+        import collections
+        from quickcheck.implementations import _AliasTable
+        table = _AliasTable([1, 0, 3])
+        r = random.Random(5)
+        counts = collections.Counter(table.sample(r) for _ in range(20000))
+        self.assertEqual(counts[1], 0)
+        self.assertAlmostEqual(counts[2] / counts[0], 3, delta=0.3)
+        self.assertRaises(ValueError, _AliasTable, [0, 0])
+        self.assertRaises(ValueError, _AliasTable, [1, -1])
+    
+    def test_frequency(self):
+        spec = qc.Frequency((99, qc.Constant('common')), (1, int), (0, str))
+        with qc.seeded(3):
+            values = [qc.arbitrary(spec) for _ in range(1000)]
+        self.assertGreater(values.count('common'), 950)
+        self.assertTrue(any(isinstance(v, int) for v in values))
+        self.assertEqual(list(qc.series(spec, 0)), ['common', 0])
+    
+    def test_weighted_choice(self):
+        spec = qc.Choice('a', 'b', 'c', weights=[0, 1, 0])
+        self.assertEqual(set(qc.arbitrary(spec) for _ in range(50)), {'b'})
+        spec = qc.Any(bool, str, weights=[1, 0])
+        self.assertTrue(all(isinstance(qc.arbitrary(spec), bool) for _ in range(50)))
+        self.assertRaises(ValueError, qc.Choice, 'a', 'b', weights=[1])
+    
+    def test_weighted_shrink(self):
+        spec = qc.Choice('a', 'b', 'c', 'd', weights=[0, 1, 0, 1])
+        self.assertEqual(list(qc.shrink_spec(spec, 'd')), ['b'])
+        self.assertEqual(list(qc.shrink_spec(spec, 'b')), [])
+        spec = qc.Frequency((0, int), (1, str))
+        self.assertTrue(all(isinstance(v, str) for v in qc.shrink_spec(spec, 'abc')))
+
+class TestSizes(unittest.TestCase):
+    def test_nested_lists_split(self):
+        spec = qc.List(qc.List(qc.List(int)))
+        for _ in range(50):
+            v = qc.arbitrary(spec, size=100)
+            self.assertLessEqual(sum(len(b) for a in v for b in a), 100)
+    
+    def test_tuple_split(self):
+        spec = qc.Tuple(qc.List(int), qc.List(int))
+        for _ in range(50):
+            a, b = qc.arbitrary(spec, size=10)
+            self.assertLessEqual(len(a) + len(b), 10)
+    
+    def test_no_split(self):
+        self.assertEqual(qc.arbitrary(qc.Tuple(SizeSpec(), SizeSpec()), size=10), (5, 5))
+        self.assertEqual(qc.arbitrary(qc.Tuple(SizeSpec(), SizeSpec(), split=False), size=10), (10, 10))
+        v = qc.arbitrary(qc.List(SizeSpec(), lengthmin=2, lengthmax=2, split=False), size=10)
+        self.assertEqual(v, [10, 10])
+    
+    def test_split_size(self):
+        self.assertEqual(qc.split_size(100, 3), 33)
+        self.assertEqual(qc.split_size(100, 0), 100)
+        self.assertIsNone(qc.split_size(None, 3))
+
+class TestRecursive(unittest.TestCase):
+    tree = qc.Recursive(int, lambda tree: qc.List(tree, lengthmin=1))
+    
+    def leaves(self, t):
+        if isinstance(t, list):
+            return sum(self.leaves(c) for c in t)
+        return 1
+    
+    def depth(self, t):
+        if isinstance(t, (list, tuple)):
+            return 1 + max(self.depth(c) for c in t)
+        return 0
+    
+    def test_bounded(self):
+        for _ in range(50):
+            t = qc.arbitrary(self.tree, size=100)
+            self.assertLessEqual(self.leaves(t), 100)
+    
+    def test_max_depth(self):
+        tree = qc.Recursive(int, lambda tree: qc.Tuple(tree, tree, split=False), max_depth=3)
+        for _ in range(50):
+            t = qc.arbitrary(tree, size=100)
+            self.assertLessEqual(self.depth(t), 3)
+    
+    def test_deferred(self):
+        tree = qc.Deferred(lambda: qc.Any(int, qc.List(tree)))
+        for _ in range(50):
+            qc.arbitrary(tree, size=100)
+    
+    def test_shrink_to_leaf(self):
+        @qc.quickcheck()
+        def prop(t: self.tree):
+            if isinstance(t, list) and any(isinstance(c, list) for c in t):
+                raise ValueError(t)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'t': [[0]]})
+    
+    def test_nested_lengthmin(self):
+        spec = qc.Maybe(qc.List(int, lengthmin=2))
+        shrinks = list(qc.shrink_spec(spec, [5, 6, 7]))
+        self.assertIn(None, shrinks)
+        self.assertTrue(all(v is None or len(v) >= 2 for v in shrinks))
+        spec = qc.Tuple(qc.List(int, lengthmin=2), qc.Dict(int, int, lengthmin=1))
+        @qc.quickcheck()
+        def prop(t: spec):
+            raise ValueError(t)
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'t': ([0, 0], {0: 0})})
+    
+    def test_shrink_respects_branch(self):
+        shrinks = list(self.tree.shrink([[3], 4]))
+        self.assertIn(0, shrinks)
+        self.assertNotIn([], shrinks)
+        self.assertNotIn([[]], shrinks)
+        self.assertNotIn([[], 4], shrinks)
+
+class TestBytes(unittest.TestCase):
+    @qc.quickcheck()
+    def test_bytes_len(self, minlen: qc.Integer(min=0, max=50), extra: qc.Integer(min=0, max=50)):
+        v = qc.arbitrary(qc.Bytes(minlen, minlen + extra))
+        self.assertIsInstance(v, bytes)
+        self.assertGreaterEqual(len(v), minlen)
+        self.assertLessEqual(len(v), minlen + extra)
+        return True
+    
+    @qc.quickcheck()
+    def test_alphabet(self, alphabet: qc.Bytes(minlen=1)):
+        v = qc.arbitrary(qc.Bytes(alphabet=alphabet))
+        self.assertTrue(set(v) <= set(alphabet))
+        return True
+    
+    def test_types(self):
+        self.assertIsInstance(qc.arbitrary(bytearray), bytearray)
+        self.assertIsInstance(qc.arbitrary(memoryview), memoryview)
+    
+    def test_series(self):
+        self.assertEqual(list(qc.series(qc.Bytes(minlen=1), 0)), [b'\x00'])
+        self.assertEqual(list(qc.series(bytes, 1)), [b'', b'\x00', b'\x01'])
+        self.assertEqual(list(qc.series(qc.Bytes(alphabet=b'ab', minlen=2), 0)), [b'aa'])
+    
+    def test_shrink(self):
+        spec = qc.Bytes(minlen=2, alphabet=b'xy')
+        shrinks = list(qc.shrink_spec(spec, b'yyx'))
+        self.assertIn(b'yx', shrinks)
+        self.assertIn(b'xyx', shrinks)
+        self.assertTrue(all(len(v) >= 2 and set(v) <= set(b'xy') for v in shrinks))
+        @qc.quickcheck()
+        def prop(v: spec):
+            if b'y' in v:
+                raise ValueError(v)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        # one y, with the fewest other bytes the spec allows
+        self.assertIn(cm.exception.used['v'], [b'xy', b'yx'])
+    
+    def test_mmap(self):
+        v = qc.arbitrary(qc.Bytes(minlen=4096, type=memoryview, mmap_threshold=1024))
+        self.assertGreaterEqual(len(v), 4096)
+        self.assertIsInstance(v.obj, mmap.mmap)
+    
+    def test_shrink_memoryview(self):
+        v = memoryview(b'abcd')
+        self.assertEqual([bytes(x) for x in qc.shrink(v)], [b'ab', b'cd', b'abc', b'bcd'])
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.files = {}
+        for i, data in enumerate([b'hello world', bytes(range(256)), b'x' * 50000]):
+            os.makedirs(os.path.join(self.dir.name, str(i % 2)), exist_ok=True)
+            path = os.path.join(self.dir.name, str(i % 2), str(i))
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.files[path] = data
+        # empty files are skipped
+        open(os.path.join(self.dir.name, 'empty'), 'wb').close()
+    
+    def tearDown(self):
+        self.dir.cleanup()
+    
+    def test_unmutated(self):
+        corpus = qc.Corpus(self.dir.name, mutate=False, type=bytes)
+        self.assertEqual(len(corpus.files), 3)
+        for _ in range(20):
+            self.assertIn(qc.arbitrary(corpus), self.files.values())
+        self.assertEqual(sorted(qc.series(corpus, 0)), sorted(self.files.values()))
+    
+    def test_memoryview(self):
+        corpus = qc.Corpus(self.dir.name, mutate=False, max_length=100, max_open=1)
+        for _ in range(20):
+            v = qc.arbitrary(corpus)
+            self.assertIsInstance(v, memoryview)
+            self.assertLessEqual(len(v), 100)
+            self.assertTrue(any(bytes(v) in data for data in self.files.values()))
+            self.assertLessEqual(len(corpus._maps), 1)
+    
+    def test_mutated(self):
+        corpus = qc.Corpus(self.dir.name, type=bytes)
+        values = [qc.arbitrary(corpus, size=10) for _ in range(50)]
+        self.assertTrue(all(isinstance(v, bytes) for v in values))
+        self.assertTrue(any(v not in self.files.values() for v in values))
+    
+    def test_mutated_bounded(self):
+        corpus = qc.Corpus(self.dir.name, mutate_length=1000)
+        for _ in range(50):
+            v = qc.arbitrary(corpus, size=10)
+            self.assertIsInstance(v, memoryview)
+            # a whole file when unmutated, or windows spliced together
+            self.assertTrue(len(v) <= 4000 or v in self.files.values())
+    
+    def test_shrink(self):
+        @qc.quickcheck()
+        def prop(data: qc.Corpus(self.dir.name, mutate=False, type=bytes)):
+            if b'o' in data:
+                raise ValueError(data)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'data': b'o'})
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "arrays require numpy")
+class TestArrays(unittest.TestCase):
+    def test_size_budget(self):
+        spec = qc.Array('int16', shape=(None, 3, None))
+        for _ in range(50):
+            a = qc.arbitrary(spec, size=60)
+            self.assertEqual(a.dtype, numpy.int16)
+            self.assertEqual(a.shape[1], 3)
+            self.assertLessEqual(a.size, 60)
+    
+    def test_elements(self):
+        a = qc.arbitrary(qc.Array(float, elements=(2, 3)), size=1000)
+        self.assertTrue(((a >= 2) & (a <= 3)).all())
+        with qc.seeded(4):
+            b = qc.arbitrary(qc.Array(float, elements=(2, 3)), size=1000)
+        with qc.seeded(4):
+            self.assertTrue((b == qc.arbitrary(qc.Array(float, elements=(2, 3)), size=1000)).all())
+    
+    def test_shrinks_to_views(self):
+        spec = qc.Array(int, shape=2)
+        a = numpy.arange(1, 17).reshape(4, 4)
+        sliced = list(spec.sliced(a))
+        self.assertTrue(all(numpy.shares_memory(s, a) for s in sliced))
+        self.assertIn((2, 4), [s.shape for s in sliced])
+        self.assertIn((4, 2), [s.shape for s in sliced])
+        self.assertEqual(next(spec.zeroed(a)).sum(), 0)
+    
+    def test_shrinking(self):
+        @qc.quickcheck()
+        def prop(a: qc.Array('int32', elements=(0, 100))):
+            assert (a < 50).all()
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used['a'].size, 1)
+
+class TestTypeHints(unittest.TestCase):
+    @qc.quickcheck()
+    def test_list(self, v: typing.List[int], w: list[bool]):
+        self.assertIsInstance(v, list)
+        self.assertTrue(all(type(x) is int for x in v))
+        self.assertTrue(all(type(x) is bool for x in w))
+        return True
+    
+    @qc.quickcheck()
+    def test_tuple(self, v: tuple[int, str], w: tuple[float, ...]):
+        self.assertEqual([type(x) for x in v], [int, str])
+        self.assertIsInstance(w, tuple)
+        self.assertTrue(all(type(x) is float for x in w))
+        return True
+    
+    @qc.quickcheck()
+    def test_dict(self, v: dict[str, float], w: typing.FrozenSet[int]):
+        self.assertTrue(all(type(k) is str and type(x) is float for k, x in v.items()))
+        self.assertIsInstance(w, frozenset)
+        return True
+    
+    @qc.quickcheck()
+    def test_unions(self, v: typing.Optional[int], w: typing.Union[int, str]):
+        self.assertIn(type(v), (int, type(None)))
+        self.assertIn(type(w), (int, str))
+        return True
+    
+    @qc.quickcheck()
+    def test_literal(self, v: typing.Literal['a', 'b', 3]):
+        self.assertIn(v, ('a', 'b', 3))
+        return True
+    
+    @qc.quickcheck()
+    def test_annotated(self, v: typing.Annotated[int, qc.Integer(min=5, max=10)]):
+        self.assertTrue(5 <= v <= 10)
+        return True
+    
+    def test_arbitrary(self):
+        self.assertIsInstance(qc.arbitrary(list[int]), list)
+        self.assertRaises(NotImplementedError, qc.arbitrary, typing.List)
+    
+    def test_cached(self):
+        hint = dict[str, typing.List[typing.Optional[int]]]
+        self.assertIs(qc.resolve(hint), qc.resolve(hint))
+        self.assertIs(qc.resolve(int), int)
+    
+    def test_cache_bounded(self):
+        from quickcheck.typehints import _cached_resolve
+        for n in range(_cached_resolve.cache_info().maxsize + 10):
+            qc.resolve(typing.Literal[n])
+        info = _cached_resolve.cache_info()
+        self.assertEqual(info.currsize, info.maxsize)
+    
+    def test_string(self):
+        self.assertIsInstance(qc.resolve('list[int]'), qc.List)
+    
+    def test_shrink_dict(self):
+        @qc.quickcheck()
+        def prop(d: dict[int, int]):
+            if len(d) >= 2:
+                raise ValueError(d)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(len(cm.exception.used['d']), 2)
+        self.assertEqual(sorted(cm.exception.used['d'].values()), [0, 0])
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: float = 0.0
+    tags: typing.List[str] = dataclasses.field(default_factory=list)
+
+class Pair(typing.NamedTuple):
+    a: int
+    b: str = ''
+
+class Plain:
+    def __init__(self, n: qc.Integer(min=0, max=10), unused=None):
+        self.n = n
+
+@dataclasses.dataclass
+class Node:
+    value: int
+    next: 'typing.Optional[Node]' = None
+
+class TestRecords(unittest.TestCase):
+    @qc.quickcheck()
+    def test_dataclass(self, p: Point, ps: typing.List[Pair]):
+        self.assertIsInstance(p.x, int)
+        self.assertIsInstance(p.y, float)
+        self.assertTrue(all(isinstance(t, str) for t in p.tags))
+        self.assertTrue(all(isinstance(v, Pair) for v in ps))
+        return True
+    
+    @qc.quickcheck()
+    def test_plain(self, v: Plain):
+        self.assertTrue(0 <= v.n <= 10)
+        return True
+    
+    def test_recursive(self):
+        self.assertIsInstance(qc.arbitrary(Node), Node)
+    
+    def test_compiled_once(self):
+        self.assertIs(qc.resolve(Point), qc.resolve(Point))
+        self.assertIs(qc.resolve(Point).plan, qc.resolve(Point).plan)
+    
+    def test_shrink(self):
+        self.assertIn(Pair(0, 'ab'), list(qc.shrink(Pair(5, 'ab'))))
+        self.assertTrue(all(isinstance(v, Pair) for v in qc.shrink(Pair(5, 'ab'))))
+        passes = qc.shrink_passes(None, Point(5))
+        self.assertEqual([name for name, _ in passes], ['x', 'y', 'tags'])
+    
+    def test_minimal(self):
+        @qc.quickcheck()
+        def prop(p: Point):
+            if p.x >= 10:
+                raise ValueError(p)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used['p'].x, 10)
+        self.assertEqual(cm.exception.used['p'].tags, [])
+
+class TestShrinking(unittest.TestCase):
+    def failing(self, **kwargs):
+        @qc.quickcheck(**kwargs)
+        def prop(x: qc.Integer(min=1000, max=100000)):
+            if x >= 10:
+                raise ValueError(x)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        return cm.exception
+    
+    def test_minimal(self):
+        e = self.failing()
+        self.assertEqual(e.used, {'x': 10})
+        self.assertEqual(e.shrink.reason, 'minimal')
+    
+    def test_fixed_arguments_skipped(self):
+        seen = []
+        @qc.quickcheck()
+        def prop(x: qc.Integer(min=10, max=1000), l: qc.List(int, lengthmin=3)):
+            seen.append(x)
+            if x >= 10 and len(l) >= 3:
+                raise ValueError(x)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'x': 10, 'l': [0, 0, 0]})
+        # once x is minimal, its shrinks are only retried once, at the end
+        after = seen[seen.index(10):]
+        self.assertLessEqual(len([x for x in after if x < 10]), 8)
+    
+    def test_shrink_passes(self):
+        passes = qc.shrink_passes(qc.List(int), [1, 2, 3, 4])
+        self.assertEqual([name for name, _ in passes], ['halve', 'delete', 'simplify'])
+        self.assertEqual(list(passes[0][1]), [[1, 2], [3, 4]])
+        passes = qc.shrink_passes(None, "abcd")
+        self.assertEqual([name for name, _ in passes], ['halve', 'delete', 'simplify'])
+        self.assertEqual([name for name, _ in qc.shrink_passes(int, 5)], ['shrink'])
+    
+    def test_multiple_failures(self):
+        @qc.quickcheck(tries=1000, max_failures=3)
+        def prop(x: int, l: qc.List(int)):
+            if len(l) > 3:
+                raise ValueError(l)
+            if x > 20:
+                raise ValueError(x)
+            if x < -20:
+                raise KeyError(x)
+            return True
+        with self.assertRaises(qc.MultipleFailures) as cm:
+            prop()
+        e = cm.exception
+        self.assertIsInstance(e, qc.QuickCheckError)
+        used = sorted((type(err.__cause__).__name__, err.fingerprint[1][1], sorted(err.used.items()))
+                      for err in e.failures)
+        self.assertEqual([u[0] for u in used], ['KeyError', 'ValueError', 'ValueError'])
+        self.assertIn([('l', []), ('x', -21)], [u[2] for u in used])
+        self.assertIn([('l', []), ('x', 21)], [u[2] for u in used])
+        self.assertIn([('l', [0, 0, 0, 0]), ('x', 0)], [u[2] for u in used])
+        self.assertIn("3 distinct failures", str(e))
+    
+    def test_one_failure_of_many(self):
+        @qc.quickcheck(max_failures=5)
+        def prop(x: int):
+            if x > 20:
+                raise ValueError(x)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertNotIsInstance(cm.exception, qc.MultipleFailures)
+        self.assertEqual(cm.exception.used, {'x': 21})
+        self.assertGreater(cm.exception.occurrences, 1)
+    
+    def test_shrink_budget(self):
+        e = self.failing(shrink_budget=0)
+        self.assertEqual(e.shrink.steps, 0)
+        self.assertEqual(e.shrink.calls, 0)
+        self.assertEqual(e.shrink.reason, 'shrink_budget')
+        self.assertGreaterEqual(e.used['x'], 1000)
+    
+    def test_max_shrink_calls(self):
+        e = self.failing(max_shrink_calls=3)
+        self.assertEqual(e.shrink.calls, 3)
+        self.assertEqual(e.shrink.reason, 'max_shrink_calls')
+    
+    def test_shrink_timeout(self):
+        e = self.failing(shrink_timeout=0)
+        self.assertEqual(e.shrink.reason, 'shrink_timeout')
+    
+    def test_progress(self):
+        events = []
+        e = self.failing(shrink_progress=events.append, shrink_progress_interval=0)
+        self.assertIs(events[-1], e.shrink)
+        self.assertEqual(len(events), e.shrink.calls + 1)
+
+class Unshrinkable(qc.ArbitrarySpec):
+    # makes values shrink() knows nothing about
+    def arbitrary(self, size=None):
+        n = qc.arbitrary(qc.Integer(min=0, max=20))
+        return tuple(qc.arbitrary(qc.Maybe(int)) for _ in range(n))
+    
+    def shrink(self, v):
+        return []
+
+class TestChoices(unittest.TestCase):
+    def failing(self, **kwargs):
+        @qc.quickcheck(engine='choices', **kwargs)
+        def prop(v: Unshrinkable()):
+            if len(v) >= 3:
+                raise ValueError(v)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        return cm.exception
+    
+    def test_shrinks_any_spec(self):
+        e = self.failing()
+        self.assertEqual(e.used, {'v': (None, None, None)})
+        self.assertEqual(e.shrink.reason, 'minimal')
+    
+    def test_threads(self):
+        e = self.failing(threads=4)
+        self.assertEqual(e.used, {'v': (None, None, None)})
+    
+    def test_replay(self):
+        from quickcheck import choices
+        r = choices.ChoiceRandom(1234)
+        with qc.seeded(r):
+            v = qc.arbitrary(qc.List(qc.Tuple(int, str, bytes)))
+        with qc.seeded(choices.ChoiceRandom(choices=r.recorded)):
+            self.assertEqual(qc.arbitrary(qc.List(qc.Tuple(int, str, bytes))), v)
+        self.assertEqual(choices.decode(choices.encode(17, r.recorded)), (17, r.recorded))
+        # still a working random.Random
+        self.assertEqual(len(r.choices('abc', k=5)), 5)
+    
+    def test_replay_failure(self):
+        calls = []
+        e = self.failing()
+        @qc.quickcheck(replay=e.replay)
+        def prop(v: Unshrinkable()):
+            calls.append(v)
+            if len(v) >= 3:
+                raise ValueError(v)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(calls, [(None, None, None)])
+        self.assertEqual(cm.exception.replay, e.replay)
+
+class TestEnumerate(unittest.TestCase):
+    def test_series(self):
+        self.assertEqual(list(qc.series(int, 2)), [0, 1, -1, 2, -2])
+        self.assertEqual(list(qc.series(qc.Integer(min=3, max=4), 5)), [3, 4])
+        self.assertEqual(list(qc.series(qc.List(bool, lengthmax=1), 3)), [[], [False], [True]])
+        self.assertEqual(list(qc.series(qc.Maybe(qc.Choice('a', 'b')), 0)), [None, 'a', 'b'])
+        self.assertEqual(list(qc.series(typing.Tuple[bool, bool], 1)),
+                         [(False, False), (False, True), (True, False), (True, True)])
+        self.assertEqual(len(list(qc.series(qc.Dict(bool, bool), 2))), 9)
+        self.assertEqual(list(qc.series(Pair, 1)), [Pair(0, '')])
+    
+    def test_lazy(self):
+        # far too many to list, but the first few come right away
+        values = qc.series(qc.List(qc.List(int)), 10)
+        self.assertEqual(next(iter(values)), [])
+    
+    def test_exhaustive(self):
+        seen = []
+        @qc.quickcheck(mode='enumerate', depth=2, tries=5)
+        def prop(x: int, b: bool):
+            with qc.sized() as size:
+                seen.append((size, x, b))
+            return True
+        prop()
+        enumerated = [(x, b) for size, x, b in seen if size == 2]
+        self.assertEqual(len(enumerated), 10)
+        self.assertEqual(len(set(enumerated)), 10)
+        self.assertEqual(len(seen), 10)
+    
+    def test_then_random(self):
+        sizes = []
+        @qc.quickcheck(mode='enumerate', depth=1, tries=20)
+        def prop(b: bool):
+            with qc.sized() as size:
+                sizes.append(size)
+            return True
+        prop()
+        self.assertEqual(sizes[:2], [1, 1])
+        self.assertEqual(len(sizes), 20)
+        self.assertTrue(all(size > 1 for size in sizes[2:]))
+    
+    def test_without_series(self):
+        class NoSeries(qc.ArbitrarySpec):
+            def arbitrary(self):
+                return qc.rng().randrange(1000)
+        seen = []
+        @qc.quickcheck(mode='enumerate', depth=2, tries=20)
+        def prop(x: NoSeries(), b: bool):
+            with qc.sized() as size:
+                seen.append((size, x, b))
+            return True
+        prop()
+        self.assertEqual([b for size, x, b in seen[:2]], [False, True])
+        self.assertEqual(len(seen), 20)
+        seen.clear()
+        @qc.quickcheck(mode='enumerate', depth=2, tries=20)
+        def prop(x: NoSeries()):
+            seen.append(x)
+            return True
+        prop()
+        self.assertEqual(len(seen), 20)
+    
+    def test_finds_corner_case(self):
+        calls = []
+        @qc.quickcheck(mode='enumerate', depth=3)
+        def prop(l: qc.List(int)):
+            calls.append(l)
+            if l == [0, -1]:
+                raise ValueError(l)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'l': [0, -1]})
+        self.assertLess(len(calls), 50)
+
+class TestDedup(unittest.TestCase):
+    def test_skips_duplicates(self):
+        calls = []
+        results = []
+        @qc.quickcheck(dedup=True, report=results.append)
+        def prop(x: qc.Integer(min=0, max=50), l: qc.List(bool, lengthmax=2)):
+            calls.append((x, l))
+            return True
+        prop()
+        self.assertEqual(len(calls), len(set((x, tuple(l)) for x, l in calls)))
+        self.assertGreater(results[0].duplicates, 0)
+        self.assertIn("duplicates skipped", str(results[0]))
+    
+    def test_exhausted(self):
+        calls = []
+        results = []
+        @qc.quickcheck(dedup=True, max_duplicates=50, report=results.append)
+        def prop(b: bool):
+            calls.append(b)
+            return True
+        prop()
+        self.assertEqual(sorted(calls), [False, True])
+        self.assertTrue(results[0].exhausted)
+        self.assertEqual(results[0].successes, 2)
+    
+    def test_structural_hash(self):
+        from quickcheck.dedup import structural_hash
+        self.assertEqual(structural_hash({'a': [1, 2], 'b': {3}}), structural_hash({'b': {3}, 'a': [1, 2]}))
+        self.assertNotEqual(structural_hash([1, 2]), structural_hash((1, 2)))
+        self.assertNotEqual(structural_hash(['ab', 'c']), structural_hash(['a', 'bc']))
+        self.assertEqual(structural_hash(Point(1)), structural_hash(Point(1)))
+        a, b = [1], [1]
+        a.append(a)
+        b.append(b)
+        self.assertEqual(structural_hash(a), structural_hash(b))
+        self.assertNotEqual(structural_hash(a), structural_hash([1, [1]]))
+        d = {}
+        d['self'] = d
+        p = Point(1)
+        p.x = [p]
+        structural_hash(d)
+        structural_hash(p)
+    
+    def test_bloom_filter(self):
+        from quickcheck.dedup import BloomFilter, structural_hash
+        bloom = BloomFilter(1000)
+        self.assertFalse(any(bloom.add(structural_hash(i)) for i in range(1000)))
+        self.assertTrue(all(bloom.add(structural_hash(i)) for i in range(1000)))
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'cache.json')
+    
+    def tearDown(self):
+        self.dir.cleanup()
+    
+    def checked(self, fails=False, **kwargs):
+        calls = []
+        results = []
+        kwargs.setdefault('cache', self.path)
+        kwargs.setdefault('seed', 1)
+        @qc.quickcheck(tries=20, report=results.append, **kwargs)
+        def prop(x: qc.List(int)):
+            calls.append(x)
+            if fails:
+                raise ValueError(x)
+            return True
+        prop()
+        return len(calls), results[0]
+    
+    def test_skipped_when_passed(self):
+        self.assertEqual(self.checked()[0], 20)
+        calls, results = self.checked()
+        self.assertEqual(calls, 0)
+        self.assertTrue(results.cached)
+    
+    def test_not_without_seed(self):
+        self.assertEqual(self.checked(seed=None)[0], 20)
+        calls, results = self.checked(seed=None)
+        self.assertEqual(calls, 20)
+        self.assertFalse(results.cached)
+        self.assertEqual(qc.Cache(self.path).load(), {})
+    
+    def test_cached_tries(self):
+        self.checked()
+        self.assertEqual(self.checked(cached_tries=5)[0], 5)
+    
+    def test_full_run(self):
+        self.checked()
+        self.assertEqual(self.checked(cache=qc.Cache(self.path, full_run=True))[0], 20)
+    
+    def test_key_changes(self):
+        self.checked()
+        self.assertEqual(self.checked(seed=5)[0], 20)
+        self.assertEqual(self.checked(seed=5)[0], 0)
+        self.assertEqual(self.checked(max_size=10)[0], 20)
+        c = qc.Cache(self.path)
+        def key(spec, modules=()):
+            return c.key(self.checked, {'x': spec}, modules)
+        self.assertEqual(key(qc.Recursive(int, lambda t: qc.List(t))),
+                         key(qc.Recursive(int, lambda t: qc.List(t))))
+        self.assertNotEqual(key(qc.List(int)), key(qc.List(float)))
+        self.assertNotEqual(key(int), key(int, [qc.cache]))
+    
+    def test_key_has_arguments_and_options(self):
+        calls = []
+        @qc.quickcheck(tries=5, cache=self.path, seed=1)
+        def prop(limit, x: qc.Integer(min=0, max=10)):
+            calls.append(x)
+            if x > limit:
+                raise ValueError(x)
+            return True
+        prop(limit=1000)
+        self.assertEqual(len(calls), 5)
+        prop(limit=1000)
+        self.assertEqual(len(calls), 5)
+        with self.assertRaises(qc.QuickCheckError):
+            prop(limit=-5)
+        self.checked()
+        self.assertEqual(self.checked(max_trial_memory=10 ** 9)[0], 20)
+        self.assertEqual(self.checked(dedup=True)[0], 20)
+        # isolated trials run in another process, so only the report says
+        self.assertFalse(self.checked(isolate=qc.Isolation(timeout=5))[1].cached)
+        self.assertTrue(self.checked(isolate=qc.Isolation(timeout=5))[1].cached)
+        self.assertFalse(self.checked(isolate=qc.Isolation(timeout=1))[1].cached)
+    
+    def test_key_stable_across_processes(self):
+        code = ("import quickcheck as qc\n"
+                "from quickcheck.interface import split_size\n"
+                "spec = qc.Frequency((3, int), (1, qc.Choice('a', 'b', weights=[1, 2])))\n"
+                "print(qc.Cache('unused').key(split_size, {'x': spec}))\n")
+        keys = {subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+                for _ in range(2)}
+        self.assertEqual(len(keys), 1)
+    
+    @unittest.skipIf(numpy is None, "arrays require numpy")
+    def test_key_of_big_arrays(self):
+        a = numpy.zeros(10000)
+        b = a.copy()
+        b[5000] = 1
+        self.assertEqual(repr(a), repr(b))
+        c = qc.Cache(self.path)
+        def key(v):
+            return c.key(self.checked, {'x': qc.Choice(v)})
+        self.assertNotEqual(key(a), key(b))
+        self.assertEqual(key(b), key(b.copy()))
+        self.assertNotEqual(key(a), key(a.astype(numpy.float32)))
+        self.assertNotEqual(key(a), key(a.reshape(100, 100)))
+    
+    def test_failure_forgotten(self):
+        self.checked()
+        c = qc.Cache(self.path, full_run=True)
+        with self.assertRaises(qc.QuickCheckError):
+            self.checked(fails=True, cache=c)
+        self.assertEqual(c.load(), {})
+
+class TestMemory(unittest.TestCase):
+    def test_report(self):
+        results = []
+        @qc.quickcheck(tries=30, track_memory=True, report=results.append)
+        def prop(n: int):
+            data = [0] * abs(n * 1000)
+            return True
+        prop()
+        memory = results[0].memory
+        self.assertEqual(memory.trials, 30)
+        self.assertEqual(memory.peak, memory.heaviest[0][0])
+        self.assertGreater(memory.peak, 0)
+        self.assertIn("{'n': ", memory.heaviest[0][1])
+        self.assertFalse(memory.leaking())
+    
+    def test_max_trial_memory(self):
+        @qc.quickcheck(max_trial_memory=80000)
+        def prop(n: int):
+            data = [0] * abs(n * 1000)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertIsInstance(cm.exception.__cause__, qc.MemoryLimitExceeded)
+        # a list takes 8 bytes for each item
+        self.assertEqual(cm.exception.used, {'n': 10})
+    
+    def test_leak(self):
+        leaked = []
+        results = []
+        @qc.quickcheck(tries=50, track_memory=True, report=results.append)
+        def prop(x: int):
+            leaked.append(bytes(10000))
+            return True
+        prop()
+        self.assertTrue(results[0].memory.leaking())
+        self.assertIn("possible leak", str(results[0]))
+        
+        @qc.quickcheck(max_memory_growth=5000)
+        def prop(x: int):
+            leaked.append(bytes(10000))
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertIsInstance(cm.exception.__cause__, qc.MemoryLimitExceeded)
+        self.assertEqual(cm.exception.used, {'x': 0})
+    
+    def test_not_with_threads(self):
+        with self.assertRaises(ValueError):
+            qc.quickcheck(track_memory=True, threads=2)(lambda x: True)
+
+class TestComplexity(unittest.TestCase):
+    # count comparisons instead of timing, so these don't depend on
+    # how busy the machine is
+    def counting(self):
+        ops = [0]
+        def compare(a, b):
+            ops[0] += 1
+            return a < b
+        return ops, compare, lambda: ops[0]
+    
+    def test_linear(self):
+        reports = []
+        ops, compare, timer = self.counting()
+        @qc.complexity(expected="n log n", report=reports.append, seed=1, timer=timer)
+        def prop(l: qc.List(int)):
+            ops[0] += 1
+            sorted(l, key=functools.cmp_to_key(lambda a, b: compare(b, a) - compare(a, b)))
+        prop()
+        self.assertIn(reports[0].fitted, ['1', 'log n', 'n', 'n log n'])
+        self.assertEqual(len(reports[0].measurements), 7)
+    
+    def test_real_time(self):
+        reports = []
+        @qc.complexity(expected="2^n", sizes=(16, 64), report=reports.append)
+        def prop(l: qc.List(int)):
+            sorted(l)
+        prop()
+        self.assertTrue(all(t > 0 for _, _, t in reports[0].measurements))
+    
+    def test_quadratic(self):
+        ops, compare, timer = self.counting()
+        @qc.complexity(expected="O(n)", seed=1, timer=timer)
+        def prop(l: qc.List(int)):
+            ops[0] += 1
+            for x in l:
+                sum(1 for y in l if not compare(x, y) and not compare(y, x))
+        with self.assertRaises(qc.ComplexityError) as cm:
+            prop()
+        (n1, t1), (n2, t2) = cm.exception.pair
+        self.assertGreaterEqual(n2, 2 * n1)
+        self.assertGreater(t2 / t1, 2 * n2 / n1)
+        self.assertIn(cm.exception.report.fitted, ['n^2', 'n^3', '2^n'])
+    
+    def test_sizes_without_len(self):
+        reports = []
+        @qc.complexity(expected="n", sizes=(10, 20), report=reports.append)
+        def prop(x: int):
+            pass
+        prop()
+        self.assertEqual([n for _, n, _ in reports[0].measurements], [10, 20])
+    
+    def test_model_names(self):
+        from quickcheck.growth import _model_name
+        self.assertEqual(_model_name("O(n log n)"), "n log n")
+        self.assertEqual(_model_name("nlogn"), "n log n")
+        self.assertEqual(_model_name("n²"), "n^2")
+        self.assertEqual(_model_name("n**3"), "n^3")
+        self.assertRaises(ValueError, _model_name, "n!")
+
+class TestEquivalent(unittest.TestCase):
+    def test_agree(self):
+        def fast(l: qc.List(int)):
+            return sorted(l)
+        def reference(l):
+            l = list(l)
+            for i in range(len(l)):
+                for j in range(len(l) - 1 - i):
+                    if l[j] > l[j + 1]:
+                        l[j], l[j + 1] = l[j + 1], l[j]
+            return l
+        result = qc.equivalent(fast, reference, batch=2)
+        self.assertEqual(len(result.speedups), 100)
+        self.assertTrue(all(s > 0 for s in result.speedups))
+        self.assertIn("speedup median", str(result))
+
+    def test_disagree(self):
+        def fast(x, y):
+            return x + y if x < 50 else x
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            qc.equivalent(fast, lambda x, y: x + y, args=[qc.Integer(0, 100), qc.Integer(1, 10)])
+        self.assertIsInstance(cm.exception.__cause__, qc.NotEquivalent)
+        self.assertEqual(cm.exception.used, {'arg0': 50, 'arg1': 1})
+
+    def test_key_and_tolerance(self):
+        qc.equivalent(lambda l: sorted(l, reverse=True), lambda l: list(l),
+                      args={'l': qc.List(int)}, key=sorted)
+        qc.equivalent(lambda x: x * 3 / 3, lambda x: x, args={'x': qc.Float(-1e6, 1e6)}, tolerance=1e-9)
+
+    def test_exceptions(self):
+        qc.equivalent(lambda x: 1 // x, lambda x: 1 // x, args=[qc.Integer(-2, 2)])
+        with self.assertRaises(qc.QuickCheckError):
+            qc.equivalent(lambda x: 1 // x, lambda x: 0, args=[qc.Integer(-2, 2)])
+
+    def test_reference_gets_copy(self):
+        def fast(l):
+            l.sort()
+            return l
+        qc.equivalent(fast, sorted, args=[qc.List(int)])
+
+    def test_isolated(self):
+        result = qc.equivalent(sorted, sorted, args=[qc.List(int)], tries=10, isolate=True)
+        self.assertEqual(result.speedups, [])
+        with self.assertRaises(qc.QuickCheckError):
+            qc.equivalent(sorted, list, args=[qc.List(int)], isolate=True)
+    
+    def test_batch_gets_copies(self):
+        def fast(l):
+            l.append(0)
+            return len(l)
+        def reference(l):
+            l.append(0)
+            return len(l)
+        qc.equivalent(fast, reference, args=[qc.List(int)], batch=3)
+        qc.equivalent(fast, lambda l: len(l) + 1, args=[qc.List(int)], batch=3)
+
+class TestProfiling(unittest.TestCase):
+    def test_tree(self):
+        spec = qc.List(qc.Tuple(qc.Char(), int), lengthmin=1)
+        with qc.profiling() as profile:
+            for _ in range(10):
+                qc.arbitrary(spec, size=20)
+        lists = profile.root.children['List']
+        self.assertEqual(lists.calls, 10)
+        tuples = lists.children['Tuple']
+        self.assertEqual(tuples.calls, lists.items)
+        self.assertEqual(set(tuples.children), {'Char', 'int'})
+        self.assertEqual(tuples.children['Char'].calls, tuples.calls)
+        self.assertGreaterEqual(lists.time, tuples.time)
+        self.assertIn("List;Tuple;Char ", profile.collapsed())
+    
+    def test_json(self):
+        import json
+        with qc.profiling() as profile:
+            qc.arbitrary(qc.List(int), size=5)
+        tree = json.loads(profile.to_json())
+        self.assertEqual(tree['children'][0]['name'], 'List')
+        self.assertIn('self_time', tree['children'][0])
+    
+    def test_property(self):
+        @qc.quickcheck(tries=20)
+        def prop(x: qc.List(str)):
+            return True
+        with qc.profiling() as profile:
+            prop()
+        self.assertEqual(profile.root.children['List'].calls, 20)
+        with qc.profiling() as other:
+            pass
+        self.assertEqual(other.root.children, {})
+
+class TestTargeting(unittest.TestCase):
+    def test_highest_kept(self):
+        reports = []
+        @qc.quickcheck(report=reports.append)
+        def prop(l: qc.List(int)):
+            qc.target(len(l))
+            qc.target(-len(l), 'shortness')
+            return True
+        prop()
+        highest = reports[0].targets['']
+        self.assertEqual(len(highest), 5)
+        self.assertEqual(highest[0][0], len(highest[0][1]['l']))
+        self.assertEqual([score for score, _ in highest], sorted((s for s, _ in highest), reverse=True))
+        self.assertEqual(reports[0].targets['shortness'][0][0], 0)
+        self.assertIn("highest target:", str(reports[0]))
+    
+    def test_maximize(self):
+        def best(**kwargs):
+            reports = []
+            @qc.quickcheck(tries=20, report=reports.append, **kwargs)
+            def prop(l: qc.List(qc.Integer(min=0)), s: str):
+                qc.target(len(l) + sum(l), 'cost')
+                return True
+            prop()
+            return reports[0].targets['cost'][0]
+        plain, _ = best()
+        searched, used = best(maximize='cost', maximize_tries=100)
+        self.assertGreater(searched, 2 * plain)
+        self.assertLessEqual(len(used['l']), 100)
+    
+    def test_search_counted_apart(self):
+        reports = []
+        @qc.quickcheck(tries=20, report=reports.append, maximize=True, maximize_tries=50)
+        def prop(x: qc.Integer(min=0)):
+            qc.target(x)
+            return True
+        prop()
+        self.assertEqual(reports[0].successes, 20)
+        self.assertEqual(reports[0].statistics.trials, 20)
+        self.assertEqual(reports[0].searched, 50)
+        self.assertIn("50 searched", str(reports[0]))
+    
+    def test_maximize_finds_failure(self):
+        @qc.quickcheck(tries=10, maximize=True, maximize_tries=200)
+        def prop(x: qc.Integer(min=0)):
+            qc.target(x)
+            assert x < 90
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'x': 90})
+    
+    def test_grow(self):
+        self.assertEqual(list(qc.grow(5)), [10, 6])
+        self.assertEqual(list(qc.grow(-3)), [-6, -4])
+        self.assertEqual(list(qc.grow(False)), [True])
+        self.assertEqual(list(qc.grow_spec(qc.Integer(min=10, max=20), 15)), [20, 16])
+        self.assertEqual(list(qc.grow_spec(qc.Integer(min=0.5), 1)), [2])
+        self.assertEqual(list(qc.grow_spec(qc.Integer(min=0.5), 3)), [5, 4])
+        self.assertEqual(list(qc.grow_spec(qc.Float(min=0.5), 2.0)), [3.5, 3.0])
+        self.assertEqual(list(qc.grow_spec(qc.Choice('a', 'b'), 'a')), [])
+        with qc.sized(4):
+            self.assertEqual(list(qc.grow([1, 2]))[0], [1, 2, 1, 2])
+            self.assertEqual(len(list(qc.grow_spec(qc.List(int), [1, 2, 3]))[0]), 4)
+            self.assertEqual([len(s) for s in qc.grow('abc')], [4])
+        self.assertEqual(list(qc.grow_spec(qc.List(int, lengthmax=2), [1, 2]))[:2], [[2, 2], [1, 4]])
+
+class TestStatistics(unittest.TestCase):
+    def test_labels(self):
+        reports = []
+        @qc.quickcheck(report=reports.append)
+        def prop(l: qc.List(int)):
+            qc.classify(not l, "empty")
+            qc.classify(len(l) > 10, "long")
+            qc.label("always")
+            qc.collect(len(l) % 2)
+            return True
+        prop()
+        report, = reports
+        stats = report.statistics
+        self.assertEqual(report.successes, 100)
+        self.assertEqual(stats.percent("always"), 100.0)
+        self.assertEqual(stats.labels["0"] + stats.labels["1"], 100)
+        self.assertGreater(stats.labels["empty"], 0)
+        self.assertIn("% long", str(report))
+    
+    def test_labels_outside_trials(self):
+        qc.label("ignored")
+        qc.cover(50, "ignored")
+    
+    def test_cover_keeps_going(self):
+        reports = []
+        # small sizes come first, so the first 10 trials are rarely big
+        @qc.quickcheck(tries=10, report=reports.append, seed=1)
+        def prop(x: qc.Integer(min=0)):
+            qc.cover(40, "big", x > 5)
+            return True
+        prop()
+        report, = reports
+        self.assertGreater(report.successes, 10)
+        self.assertGreaterEqual(report.statistics.percent("big"), 40)
+    
+    def test_cover_fails(self):
+        @qc.quickcheck(tries=10)
+        def prop(x: int):
+            qc.cover(10, "impossible", False)
+            return True
+        with self.assertRaises(qc.CoverageError) as cm:
+            prop()
+        self.assertEqual(cm.exception.report.successes, 100)
+        self.assertEqual(cm.exception.report.statistics.insufficient(), [("impossible", 10, 0.0)])
+
+@unittest.skipUnless(hasattr(os, 'fork'), "isolation requires fork")
+class TwoArgumentError(Exception):
+    # pickles, but unpickling calls __init__ with only one argument
+    def __init__(self, a, b):
+        super().__init__(a)
+
+class TestIsolation(unittest.TestCase):
+    def test_runs_in_worker(self):
+        parent = os.getpid()
+        @qc.quickcheck(tries=10, isolate=qc.Isolation(max_trials=3))
+        def prop(x: int):
+            self.assertNotEqual(os.getpid(), parent)
+            return True
+        prop()
+    
+    def test_crash_is_shrunk(self):
+        @qc.quickcheck(isolate=True)
+        def prop(x: qc.Integer(min=0)):
+            if x >= 10:
+                os._exit(1)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.args[0], {'x': 10})
+        self.assertIsInstance(cm.exception.__cause__, qc.TrialCrashed)
+    
+    def test_timeout_is_shrunk(self):
+        @qc.quickcheck(isolate=qc.Isolation(timeout=0.1))
+        def prop(x: qc.Integer(min=0)):
+            if x >= 10:
+                time.sleep(10)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.args[0], {'x': 10})
+        self.assertIsInstance(cm.exception.__cause__, qc.TrialTimeout)
+    
+    def test_unpicklable_argument(self):
+        def target(x):
+            return x
+        with qc.Isolation().pool(target) as pool:
+            self.assertRaises(Exception, pool, x=lambda: 0)
+            self.assertEqual(len(pool.workers), 1)
+            self.assertEqual(pool(x=1), 1)
+    
+    def test_exception_that_doesnt_unpickle(self):
+        @qc.quickcheck(isolate=True)
+        def prop(x: qc.Integer(min=0)):
+            if x >= 10:
+                raise TwoArgumentError(x, 'b')
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'x': 10})
+        from quickcheck.isolation import RemoteError
+        e = cm.exception.__cause__
+        self.assertIsInstance(e, RemoteError)
+        self.assertIn("TwoArgumentError", str(e.__cause__))
+    
+    def test_result_that_doesnt_unpickle(self):
+        def target(x):
+            return TwoArgumentError(1, 2) if x else x
+        from quickcheck.isolation import RemoteError
+        with qc.Isolation().pool(target) as pool:
+            with self.assertRaises(RemoteError) as cm:
+                pool(x=1)
+            self.assertIn("TypeError", str(cm.exception.__cause__))
+            self.assertEqual(len(pool.workers), 1)
+            self.assertEqual(pool(x=0), 0)
+    
+    def test_labels_are_sent_back(self):
+        reports = []
+        @qc.quickcheck(tries=10, isolate=True, report=reports.append)
+        def prop(x: int):
+            qc.label("isolated")
+            return True
+        prop()
+        self.assertEqual(reports[0].statistics.percent("isolated"), 100.0)
+    
+    def test_multiple_failures(self):
+        @qc.quickcheck(isolate=True, max_failures=2)
+        def prop(x: int):
+            if x > 10:
+                raise ValueError(x)
+            if x < -10:
+                os._exit(1)
+            return True
+        with self.assertRaises(qc.MultipleFailures) as cm:
+            prop()
+        causes = sorted(type(err.__cause__).__name__ for err in cm.exception.failures)
+        self.assertEqual(causes, ['TrialCrashed', 'ValueError'])
+    
+    def test_exception_is_sent_back(self):
+        @qc.quickcheck(isolate=True)
+        def prop(x: qc.Integer(min=0)):
+            if x >= 10:
+                raise KeyError(x)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.args[0], {'x': 10})
+        self.assertIsInstance(cm.exception.__cause__, KeyError)
+
+class TestThreads(unittest.TestCase):
+    def test_runs_in_threads(self):
+        import threading
+        seen = set()
+        @qc.quickcheck(threads=4)
+        def prop(x: int, l: qc.List(int)):
+            seen.add(threading.current_thread())
+            return True
+        prop()
+        self.assertNotIn(threading.current_thread(), seen)
+    
+    def test_failure_is_shrunk(self):
+        @qc.quickcheck(threads=4)
+        def prop(x: qc.Integer(min=1000, max=100000), l: qc.List(int, lengthmin=3)):
+            if x >= 10 and len(l) >= 3:
+                raise ValueError(x)
+            return True
+        with self.assertRaises(qc.QuickCheckError) as cm:
+            prop()
+        self.assertEqual(cm.exception.used, {'x': 10, 'l': [0, 0, 0]})
+        self.assertEqual(cm.exception.shrink.reason, 'minimal')
+    
+    def test_labels(self):
+        results = []
+        @qc.quickcheck(tries=200, threads=4, report=results.append)
+        def prop(x: int):
+            qc.classify(x >= 0, "non-negative")
+            qc.label("all")
+            return True
+        prop()
+        stats = results[0].statistics
+        self.assertEqual(stats.labels["all"], 200)
+        self.assertGreater(stats.labels["non-negative"], 0)
+    
+    def test_seeded(self):
+        spec = qc.List(qc.Tuple(int, float, str))
+        def draw(seed):
+            with qc.seeded(seed), qc.sized(20):
+                return [qc.arbitrary(spec) for _ in range(10)]
+        self.assertEqual(draw(42), draw(42))
+        self.assertNotEqual(draw(42), draw(43))
+    
+    def test_not_with_isolate(self):
+        with self.assertRaises(ValueError):
+            qc.quickcheck(isolate=True, threads=2)(lambda x: True)
+
+class TestRunner(unittest.TestCase):
+    source = """
+import quickcheck as qc
+
+@qc.quickcheck(tries=10)
+def passes(x: int):
+    return True
+
+@qc.quickcheck(engine='choices')
+def fails(x: qc.Integer(min=0)):
+    assert x < 20
+    return True
+
+@qc.quickcheck(tries=10 ** 9)
+def endless(x: int):
+    return True
+
+def helper(x: int):
+    pass
+"""
+    
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'test_runner_props.py')
+        with open(self.path, 'w') as f:
+            f.write(self.source)
+    
+    def tearDown(self):
+        sys.modules.pop('test_runner_props', None)
+        self.dir.cleanup()
+    
+    def main(self, *argv):
+        import io
+        import contextlib
+        from quickcheck.runner import main
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            status = main(list(argv))
+        return status, out.getvalue()
+    
+    def test_discover(self):
+        from quickcheck.runner import discover
+        found = discover([self.dir.name])
+        self.assertEqual(sorted(name for _, name in found), ['endless', 'fails', 'passes'])
+        self.assertEqual(discover([self.path]), found)
+    
+    def test_run(self):
+        import json
+        status, out = self.main(self.dir.name, '--json', '--time-budget', '0.2', '-j', '2')
+        self.assertEqual(status, 1)
+        results = json.loads(out)
+        by_name = {r['name']: r for r in results['properties']}
+        self.assertEqual(by_name['test_runner_props.passes']['trials'], 10)
+        self.assertTrue(by_name['test_runner_props.endless']['out_of_time'])
+        failure = by_name['test_runner_props.fails']
+        self.assertEqual(failure['status'], 'failed')
+        self.assertIn("{'x': 20}", failure['message'])
+        self.assertGreater(failure['shrink_calls'], 0)
+        self.assertEqual(results['summary']['failed'], 1)
+        self.assertEqual(results['summary']['slowest'][0], 'test_runner_props.endless')
+        
+        status, out = self.main(self.path, '-k', 'fails', '--replay', failure['replay'])
+        self.assertEqual(status, 1)
+        self.assertIn("{'x': 20}", out)
+        self.assertIn("1 properties: 0 passed, 1 failed", out)
+    
+    def test_seed(self):
+        status, out = self.main(self.path, '-k', 'passes', '--seed', '5')
+        self.assertEqual(status, 0)
+        self.assertIn("PASSED test_runner_props.passes: 10 trials", out)
+        with self.assertRaises(SystemExit):
+            self.main(self.path, '--replay', 'AAA')
+    
+    def test_nothing_found(self):
+        status, out = self.main(self.path, '-k', 'missing')
+        self.assertEqual(status, 1)
+        self.assertIn("0 properties", out)
+    
+    def test_import_error(self):
+        import json
+        with open(os.path.join(self.dir.name, 'test_runner_broken.py'), 'w') as f:
+            f.write("raise ImportError('broken')\n")
+        try:
+            status, out = self.main(self.dir.name, '--json', '-k', 'passes')
+        finally:
+            sys.modules.pop('test_runner_broken', None)
+        self.assertEqual(status, 1)
+        by_name = {r['name']: r for r in json.loads(out)['properties']}
+        self.assertEqual(by_name['test_runner_broken']['status'], 'error')
+        self.assertIn("broken", by_name['test_runner_broken']['message'])
+        self.assertEqual(by_name['test_runner_props.passes']['status'], 'passed')
+    
+    def test_cached_gets_seed(self):
+        from quickcheck.runner import _overrides
+        with open(self.path, 'a') as f:
+            f.write("\n@qc.quickcheck(cache=qc.Cache({!r}))\n"
+                    "def cached(x: int):\n"
+                    "    return True\n".format(os.path.join(self.dir.name, 'cache')))
+        target = ('path', self.path)
+        seed = _overrides(target, 'cached', None, None, None).get('seed')
+        self.assertIsNotNone(seed)
+        self.assertEqual(_overrides(target, 'cached', None, None, None)['seed'], seed)
+        status, out = self.main(self.path, '-k', 'cached')
+        self.assertEqual(status, 0)
+        self.assertNotIn(", cached", out)
+        status, out = self.main(self.path, '-k', 'cached')
+        self.assertIn(", cached", out)
+    
+    def test_coverage_fails(self):
+        with open(self.path, 'a') as f:
+            f.write("\n@qc.quickcheck(tries=10, max_cover_ratio=2)\n"
+                    "def uncovered(x: int):\n"
+                    "    qc.cover(50, 'never', False)\n"
+                    "    return True\n")
+        status, out = self.main(self.path, '-k', 'uncovered')
+        self.assertEqual(status, 1)
+        self.assertIn("FAILED test_runner_props.uncovered", out)
+        self.assertIn("0 errors", out)
+
+class TestImport(unittest.TestCase):
+    # modules that shouldn't be imported until they're needed
+    lazy = ['quickcheck.implementations', 'quickcheck.isolation', 'multiprocessing',
+            'tempfile', 'pkg_resources', 'typing']
+    
+    # generous, but an order of magnitude above a plain import
+    max_import_time = 0.25
+    
+    def run_python(self, code):
+        out = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        return out.split('\n')
+    
+    def test_import_is_lazy(self):
+        lines = self.run_python(
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import quickcheck\n"
+            "print(time.perf_counter() - start)\n"
+            "print(' '.join(sys.modules))\n")
+        self.assertLess(float(lines[0]), self.max_import_time)
+        modules = lines[1].split()
+        for name in self.lazy:
+            self.assertNotIn(name, modules)
+    
+    def test_loaded_on_first_use(self):
+        lines = self.run_python(
+            "import sys, quickcheck\n"
+            "print(type(quickcheck.arbitrary(int)).__name__)\n"
+            "print('quickcheck.implementations' in sys.modules)\n")
+        self.assertEqual(lines[:2], ['int', 'True'])
+    
+    def test_user_implementations_win(self):
+        lines = self.run_python(
+            "import quickcheck\n"
+            "quickcheck.arbitrary.register(int)(lambda _: 42)\n"
+            "quickcheck.List\n"
+            "print(quickcheck.arbitrary(int))\n")
+        self.assertEqual(lines[0], '42')
+    
+    def test_lazy_names(self):
+        from quickcheck import implementations, isolation, typehints, cache, memory, growth, differential, profiler
+        for module in (implementations, isolation, typehints, cache, memory, growth, differential, profiler):
+            for name in module.__all__:
+                self.assertIn(name, qc.__all__)
+                self.assertIs(getattr(qc, name), getattr(module, name))
@@ -0,0 +1,206 @@
+"""Turn typing annotations, like list[int] or Optional[str], and
+record types like dataclasses, into specs for arbitrary().
+"""
+
+from .interface import ArbitrarySpec, arbitrary, series, shrink_spec, split_size
+from .implementations import Any, Choice, Dict, List, Maybe, Tuple, _is_record, _product
+from .roundrobin import roundrobin
+
+import collections.abc
+import dataclasses
+import functools
+import inspect
+import typing
+import types
+import sys
+
+__all__ = ['resolve', 'Record']
+
+_unions = (typing.Union,)
+if hasattr(types, 'UnionType'):
+    # X | Y, in python 3.10 and later
+    _unions += (types.UnionType,)
+
+_sequences = (list, collections.abc.Sequence, collections.abc.MutableSequence,
+              collections.abc.Iterable, collections.abc.Collection)
+_mappings = (dict, collections.abc.Mapping, collections.abc.MutableMapping)
+_sets = (set, frozenset, collections.abc.Set, collections.abc.MutableSet)
+
+class Converted(ArbitrarySpec):
+    """Values of spec, passed through convert."""
+    def __init__(self, spec, convert):
+        self.spec = spec
+        self.convert = convert
+
+    def arbitrary(self, size=None):
+        return self.convert(arbitrary(self.spec, size=size))
+    
+    def series(self, depth):
+        return (self.convert(v) for v in series(self.spec, depth))
+
+def _fields(cls):
+    """(name, annotation, required) for each argument of the
+    constructor of cls, and the namespace to resolve them in.
+    """
+    namespace = getattr(sys.modules.get(cls.__module__), '__dict__', None)
+    if dataclasses.is_dataclass(cls):
+        fields = [(f.name, f.type, f.default is dataclasses.MISSING and
+                   f.default_factory is dataclasses.MISSING)
+                  for f in dataclasses.fields(cls) if f.init]
+    elif issubclass(cls, tuple):
+        annotations = getattr(cls, '__annotations__', {})
+        defaults = getattr(cls, '_field_defaults', {})
+        fields = [(name, annotations.get(name, inspect.Parameter.empty), name not in defaults)
+                  for name in cls._fields]
+    else:
+        init = cls.__init__
+        namespace = getattr(init, '__globals__', namespace)
+        params = list(inspect.signature(init).parameters.values())[1:]
+        fields = [(p.name, p.annotation, p.default is inspect.Parameter.empty)
+                  for p in params if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+    return fields, namespace
+
+class Record(ArbitrarySpec):
+    """Instances of cls, a dataclass, a NamedTuple, or a class with an
+    annotated __init__, made by passing arbitrary values for each
+    annotated argument to cls. Arguments without an annotation are
+    left to their defaults. Shrinking simplifies one field at a time.
+    
+    The fields are inspected once, the first time they are needed, and
+    resolve() keeps a single Record for each class.
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self._plan = None
+    
+    @property
+    def plan(self):
+        """A list of (name, spec, required) for the fields of cls,
+        where spec is None if the field has no annotation.
+        """
+        if self._plan is None:
+            fields, namespace = _fields(self.cls)
+            plan = []
+            for name, annotation, required in fields:
+                if annotation is inspect.Parameter.empty:
+                    plan.append((name, None, required))
+                else:
+                    plan.append((name, resolve(annotation, namespace), required))
+            self._plan = plan
+        return self._plan
+    
+    def arbitrary(self, size=None):
+        plan = self.plan
+        fieldsize = split_size(size, len(plan))
+        kwargs = {}
+        for name, spec, required in plan:
+            if spec is None:
+                if required:
+                    raise NotImplementedError("arbitrary({}): {} has no annotation".format(
+                        self.cls.__name__, name))
+                continue
+            kwargs[name] = arbitrary(spec, size=fieldsize)
+        return self.cls(**kwargs)
+    
+    def series(self, depth):
+        if depth <= 0:
+            return
+        names = []
+        factories = []
+        for name, spec, required in self.plan:
+            if spec is None:
+                if required:
+                    raise NotImplementedError("series({}): {} has no annotation".format(
+                        self.cls.__name__, name))
+                continue
+            names.append(name)
+            factories.append(lambda spec=spec: series(spec, depth - 1))
+        for values in _product(factories):
+            yield self.cls(**dict(zip(names, values)))
+    
+    def _values(self, v):
+        values = {}
+        for name, spec, required in self.plan:
+            try:
+                values[name] = getattr(v, name)
+            except AttributeError:
+                if required:
+                    # we can't rebuild this one
+                    return None
+        return values
+    
+    def shrink_passes(self, v):
+        values = self._values(v)
+        if values is None:
+            return []
+        def shrinkfield(name, spec):
+            for s in shrink_spec(spec, values[name]):
+                vc = values.copy()
+                vc[name] = s
+                yield self.cls(**vc)
+        return [(name, shrinkfield(name, spec)) for name, spec, _ in self.plan if name in values]
+    
+    def shrink(self, v):
+        return roundrobin(*(shrinks for _, shrinks in self.shrink_passes(v)))
+
+def _resolve(annotation):
+    if annotation is type(None):
+        return None
+    if annotation is typing.Any:
+        return Any(None, bool, int, float, str)
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is None:
+        if _is_record(annotation):
+            return Record(annotation)
+        return annotation
+
+    if origin is typing.Annotated:
+        # use the first spec in the metadata, if there is one
+        for meta in args[1:]:
+            if isinstance(meta, ArbitrarySpec):
+                return meta
+        return resolve(args[0])
+    if origin in _unions:
+        specs = [resolve(arg) for arg in args if arg is not type(None)]
+        spec = specs[0] if len(specs) == 1 else Any(*specs)
+        if len(specs) < len(args):
+            return Maybe(spec)
+        return spec
+    if origin is typing.Literal:
+        return Choice(*args)
+    if origin is tuple:
+        if len(args) == 2 and args[1] is Ellipsis:
+            return Converted(List(resolve(args[0])), tuple)
+        return Tuple(*(resolve(arg) for arg in args))
+    if not args:
+        return annotation
+    if origin in _sequences:
+        return List(resolve(args[0]))
+    if origin in _mappings:
+        return Dict(resolve(args[0]), resolve(args[1]))
+    if origin in _sets:
+        convert = frozenset if origin is frozenset else set
+        return Converted(List(resolve(args[0])), convert)
+    return annotation
+
+# bounded, since programs that make annotations on the fly would
+# otherwise keep every one of them alive
+_cached_resolve = functools.lru_cache(maxsize=1024)(_resolve)
+
+def resolve(annotation, namespace=None):
+    """Return a spec for annotation. typing constructs become trees of
+    ArbitrarySpecs, and anything else is returned unchanged. String
+    annotations are evaluated in namespace first. Results for the most
+    recently used annotations are cached, so they are only inspected
+    once.
+    """
+    if isinstance(annotation, str):
+        annotation = eval(annotation, namespace)
+    try:
+        hash(annotation)
+    except TypeError:
+        # unhashable, like a list literal
+        return _resolve(annotation)
+    return _cached_resolve(annotation)